@@ -0,0 +1,188 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import champions2025 as ch
+
+
+# arquivo -> colunas com match_id, que recebem um deslocamento por cópia
+COLUNAS_PARTIDA = {
+    'matches.csv': ['match_id'],
+    'detailed_matches_overview.csv': ['match_id'],
+    'detailed_matches_maps.csv': ['match_id'],
+    'detailed_matches_player_stats.csv': ['match_id'],
+    'economy_data.csv': ['match_id'],
+    'performance_data.csv': ['Match ID'],
+}
+
+# arquivos agregados que não crescem com o número de partidas
+ARQUIVOS_FIXOS = ['agents_stats.csv', 'maps_stats.csv', 'event_info.csv']
+
+DESLOCAMENTO_PARTIDA = 10_000_000
+DESLOCAMENTO_JOGADOR = 1_000_000
+
+# (nome, função, kwargs)
+CONSULTAS = [
+    ('top10', ch.listar_top10_performance, {}),
+    ('especialistas', ch.top_5_especialistas, {'agente': 'Omen'}),
+    ('pickrate', ch.pickrate_por_mapa, {'mapa': 'Bind'}),
+    ('economia', ch.comparar_economia_times, {'time_a': 'PRX', 'time_b': 'G2'}),
+    ('adaptativos', ch.jogadores_adaptativos, {}),
+    ('winrate', ch.analisar_winrate_pick, {'time': 'NRG'}),
+    ('ranking', ch.ranking_final_times, {}),
+    ('matriz-economia', ch.matriz_economia, {}),
+    ('vetos', ch.analisar_vetos, {}),
+    ('mapas', ch.desempenho_por_mapa, {}),
+    ('multikills', ch.analisar_multikills, {}),
+]
+
+ARQUIVOS_CARREGAMENTO = [
+    'player_stats.csv',
+    'agents_stats.csv',
+    'economy_data.csv',
+    'detailed_matches_overview.csv',
+    'detailed_matches_maps.csv',
+    'performance_data.csv',
+    'detailed_matches_player_stats.csv',
+    'matches.csv',
+]
+
+
+def ler_original(file_name: str):
+    with open(ch.resolver_caminho(file_name), 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        return header, list(reader)
+
+
+def gerar_arquivo(file_name: str, destino: str, escala: int) -> int:
+    header, linhas = ler_original(file_name)
+    if file_name in ARQUIVOS_FIXOS:
+        escala = 1
+    pos_partida = [header.index(c) for c in COLUNAS_PARTIDA.get(file_name, [])]
+    jogadores = file_name == 'player_stats.csv'
+    if jogadores:
+        pos_nome = [header.index('player'), header.index('player_name')]
+        pos_id = header.index('player_id')
+
+    total = 0
+    with open(os.path.join(destino, file_name), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for copia in range(escala):
+            for linha in linhas:
+                if copia:
+                    linha = list(linha)
+                    for i in pos_partida:
+                        linha[i] = str(ch.parsear_int(linha[i]) + copia * DESLOCAMENTO_PARTIDA)
+                    if jogadores:
+                        for i in pos_nome:
+                            linha[i] = f"{linha[i]}_{copia}"
+                        linha[pos_id] = str(ch.parsear_int(linha[pos_id]) + copia * DESLOCAMENTO_JOGADOR)
+                writer.writerow(linha)
+                total += 1
+    return total
+
+
+def gerar_dataset(destino: str, escala: int) -> dict:
+    os.makedirs(destino, exist_ok=True)
+    arquivos = list(COLUNAS_PARTIDA) + ['player_stats.csv'] + ARQUIVOS_FIXOS
+    return {f: gerar_arquivo(f, destino, escala) for f in arquivos}
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'primeira_s': tempos[0],
+        'melhor_s': min(tempos),
+        'media_s': sum(tempos) / len(tempos),
+        'pico_bytes': pico,
+    }
+
+
+def carregar_completo(diretorio: str, file_name: str, cache_dir: str = None):
+    # o parsing é preguiçoso; acessar cada coluna força a leitura completa
+    tabela = ch.Dataset(diretorio, cache_dir=cache_dir).tabela(file_name)
+    for nome in tabela.nomes:
+        tabela[nome]
+    return tabela
+
+
+def medir_escala(diretorio: str, repeticoes: int, cache_dir: str = None) -> dict:
+    carregamento = {}
+    for file_name in ARQUIVOS_CARREGAMENTO:
+        # um Dataset novo por execução para medir leitura + parsing do zero
+        carregamento[file_name] = medir(lambda: carregar_completo(diretorio, file_name, cache_dir), repeticoes)
+
+    dataset = ch.Dataset(diretorio, cache_dir=cache_dir)
+    for file_name in ARQUIVOS_CARREGAMENTO:
+        dataset.tabela(file_name)
+    relatorios = {}
+    for nome, funcao, kwargs in CONSULTAS:
+        relatorios[nome] = medir(lambda: funcao(dataset=dataset, mostrar=False, **kwargs), repeticoes)
+    return {'carregamento': carregamento, 'relatorios': relatorios}
+
+
+def max_rss_kb():
+    # `resource` só existe em sistemas Unix
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos carregadores e relatórios com dados sintéticos.")
+    parser.add_argument('--escalas', type=int, nargs='+', default=[10, 100], help="fatores de escala (ex.: 10 100 1000)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--dados', help="diretório onde os CSVs sintéticos são gerados (padrão: temporário)")
+    parser.add_argument('--cache', help="usa o cache binário de colunas neste diretório")
+    parser.add_argument('--saida', help="arquivo JSON de resultados (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    base = args.dados or tempfile.mkdtemp(prefix='champions-bench-')
+    resultados = {
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'repeticoes': args.repeticoes,
+        'escalas': {},
+    }
+    for escala in args.escalas:
+        diretorio = os.path.join(base, f'x{escala}')
+        print(f"gerando x{escala} em {diretorio}...", file=sys.stderr)
+        linhas = gerar_dataset(diretorio, escala)
+        cache_dir = os.path.join(args.cache, f'x{escala}') if args.cache else None
+        print(f"medindo x{escala}...", file=sys.stderr)
+        medicao = medir_escala(diretorio, args.repeticoes, cache_dir)
+        medicao['linhas'] = linhas
+        resultados['escalas'][str(escala)] = medicao
+    resultados['max_rss_kb'] = max_rss_kb()
+
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
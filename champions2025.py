@@ -1,8 +1,14 @@
 import csv
 import os
+import sys
 import re
-import ast
-from statistics import median, quantiles
+import heapq
+import itertools
+import time
+from functools import lru_cache, wraps
+from array import array
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
 
 
 TEAM_ABBREVIATIONS = {
@@ -28,11 +34,25 @@ TEAM_ABBREVIATIONS = {
     'RRQ': 'RRQ', 'FNC': 'FNC'
 }
 
+ABBR_PARA_NOME = {}
+for _nome, _abbr in TEAM_ABBREVIATIONS.items():
+    ABBR_PARA_NOME.setdefault(_abbr, _nome)
+
+
 def get_team_abbr(team_name: str, mapping=TEAM_ABBREVIATIONS) -> str:
     name = team_name.strip()
     return mapping.get(name, name)
 
 
+def chave_time(team: str) -> str:
+    return get_team_abbr(team).upper()
+
+
+def get_team_name(team: str) -> str:
+    abbr = get_team_abbr(team)
+    return ABBR_PARA_NOME.get(abbr, team.strip())
+
+
 def resolver_caminho(file_name: str) -> str:
     here = os.path.dirname(os.path.abspath(__file__))
     path_root = os.path.join(here, file_name)
@@ -44,10 +64,55 @@ def resolver_caminho(file_name: str) -> str:
     return path_root
 
 
-def ler_csv_dicts(file_name: str):
-    path = resolver_caminho(file_name)
-    with open(path, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+class Instrumentacao:
+    # Contadores por etapa: [chamadas, segundos, linhas, bytes]. Os tempos são
+    # inclusivos: um relatório conta também o carregamento que disparou.
+    def __init__(self, ativo: bool = False):
+        self.ativo = ativo
+        self.etapas = {}
+
+    def registrar(self, etapa: str, segundos: float = 0.0, linhas: int = 0, bytes_lidos: int = 0):
+        total = self.etapas.get(etapa)
+        if total is None:
+            total = self.etapas[etapa] = [0, 0.0, 0, 0]
+        total[0] += 1
+        total[1] += segundos
+        total[2] += linhas
+        total[3] += bytes_lidos
+
+    def resumo(self) -> list:
+        return sorted(([etapa] + valores for etapa, valores in self.etapas.items()), key=lambda e: -e[2])
+
+    def escrever(self, saida=None):
+        headers = ["Etapa", "Chamadas", "Tempo (ms)", "Linhas", "Bytes"]
+        rows = [[etapa, n, f"{segundos * 1000:.2f}", linhas, bytes_lidos]
+                for etapa, n, segundos, linhas, bytes_lidos in self.resumo()]
+        renderizar_tabela(headers, rows, 'texto', saida or sys.stderr)
+
+
+def flag_do_ambiente(nome: str) -> bool:
+    # CHAMPIONS_INSTRUMENTAR=0 (ou false/no/off) desliga, como se não existisse
+    return os.environ.get(nome, '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+
+INSTRUMENTACAO = Instrumentacao(flag_do_ambiente('CHAMPIONS_INSTRUMENTAR'))
+
+
+def instrumentado(prefixo: str):
+    def decorar(funcao):
+        etapa = f"{prefixo}:{funcao.__name__}"
+
+        @wraps(funcao)
+        def medir(*args, **kwargs):
+            if not INSTRUMENTACAO.ativo:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                INSTRUMENTACAO.registrar(etapa, time.perf_counter() - inicio)
+        return medir
+    return decorar
 
 
 def parsear_porcentagem(value: str) -> float:
@@ -79,10 +144,15 @@ def parsear_int(value: str) -> int:
         return 0
 
 
+PADRAO_TUPLA_VITORIAS = re.compile(r"\s*(\d+)\s*\((\d+)\)\s*")
+
+
+# Os valores se repetem muito ("0 (0)", "4 (2)"...), então vale memorizar.
+@lru_cache(maxsize=4096)
 def parsear_tupla_vitorias(text: str):
     if text is None:
         return 0, 0
-    m = re.match(r"\s*(\d+)\s*\((\d+)\)\s*", str(text))
+    m = PADRAO_TUPLA_VITORIAS.match(str(text))
     if not m:
         n = parsear_int(text)
         return n, 0
@@ -91,6 +161,1635 @@ def parsear_tupla_vitorias(text: str):
     return total, wins
 
 
+def parsear_lista_agentes(value: str) -> list:
+    if not value:
+        return []
+    s = str(value).strip()
+    if s.startswith('['):
+        # "['Neon', 'Jett']": nomes de agentes não têm vírgulas nem aspas,
+        # então não precisamos do ast.literal_eval.
+        s = s.strip('[]')
+        return [a.strip().strip('\'"') for a in s.split(',') if a.strip()]
+    return [a.strip() for a in s.split(',') if a.strip()]
+
+
+# Tipo de cada coluna por arquivo; colunas ausentes ficam como texto.
+ESQUEMAS = {
+    'player_stats.csv': {
+        'player_id': parsear_int, 'agents': parsear_lista_agentes, 'agents_count': parsear_int,
+        'rounds': parsear_int, 'rating': parsear_float, 'acs': parsear_float,
+        'kd_ratio': parsear_float, 'kast': parsear_porcentagem, 'adr': parsear_float,
+        'kpr': parsear_float, 'apr': parsear_float, 'fkpr': parsear_float, 'fdpr': parsear_float,
+        'hs_percent': parsear_porcentagem, 'cl_percent': parsear_porcentagem,
+        'k_max': parsear_int, 'kills': parsear_int, 'deaths': parsear_int, 'assists': parsear_int,
+        'first_kills': parsear_int, 'first_deaths': parsear_int,
+    },
+    'agents_stats.csv': {
+        'total_utilization': parsear_float,
+    },
+    'maps_stats.csv': {
+        'times_played': parsear_int,
+        'attack_win_percent': parsear_porcentagem, 'defense_win_percent': parsear_porcentagem,
+    },
+    'economy_data.csv': {
+        'Pistol Won': parsear_int,
+        'Eco (won)': parsear_tupla_vitorias, 'Semi-eco (won)': parsear_tupla_vitorias,
+        'Semi-buy (won)': parsear_tupla_vitorias, 'Full buy(won)': parsear_tupla_vitorias,
+    },
+    'performance_data.csv': {
+        col: parsear_int for col in ['2K', '3K', '4K', '5K', '1v1', '1v2', '1v3', '1v4', '1v5', 'ECON', 'PL', 'DE']
+    },
+    'detailed_matches_maps.csv': {
+        'map_order': parsear_int,
+    },
+    'detailed_matches_overview.csv': {
+        'maps_played': parsear_int,
+    },
+    'detailed_matches_player_stats.csv': {
+        'player_id': parsear_int, 'agent': parsear_lista_agentes,
+        'rating': parsear_float, 'acs': parsear_float,
+        'k': parsear_int, 'd': parsear_int, 'a': parsear_int, 'kd_diff': parsear_int,
+        'kast': parsear_porcentagem, 'adr': parsear_float, 'hs_percent': parsear_porcentagem,
+        'fk': parsear_int, 'fd': parsear_int, 'fk_fd_diff': parsear_int,
+    },
+    'matches.csv': {
+        'score1': parsear_int, 'score2': parsear_int,
+    },
+}
+
+# Em agents_stats.csv toda coluna que não é o nome do agente é um pickrate por mapa.
+COLUNAS_PADRAO = {
+    'agents_stats.csv': (parsear_float, {'agent_name'}),
+}
+
+
+class Tabela:
+    def __init__(self, nome: str, colunas: dict, nomes=None, tamanho: int = None):
+        self.nome = nome
+        self.colunas = colunas
+        self.nomes = list(nomes) if nomes is not None else list(colunas)
+        if tamanho is None:
+            tamanho = len(next(iter(colunas.values()))) if colunas else 0
+        self.tamanho = tamanho
+        # nome -> função que produz a coluna no primeiro acesso
+        self.pendentes = {}
+        # chamada uma vez se pedirem uma coluna que não foi lida do arquivo
+        self.carregar_faltantes = None
+
+    def __len__(self):
+        return self.tamanho
+
+    def __contains__(self, coluna):
+        return coluna in self.nomes
+
+    def __getitem__(self, coluna):
+        valores = self.colunas.get(coluna)
+        if valores is None:
+            valores = self.resolver(coluna)
+        return valores
+
+    def resolver(self, coluna):
+        if coluna not in self.pendentes and self.carregar_faltantes is not None and coluna in self.nomes:
+            carregar, self.carregar_faltantes = self.carregar_faltantes, None
+            self.pendentes.update(carregar())
+        if coluna not in self.pendentes:
+            raise KeyError(coluna)
+        valores = self.colunas[coluna] = self.pendentes.pop(coluna)()
+        return valores
+
+    def get(self, coluna, padrao=None):
+        try:
+            return self[coluna]
+        except KeyError:
+            return padrao
+
+    def tornar_mutavel(self):
+        # colunas vindas do cache binário são somente leitura
+        for nome in self.nomes:
+            valores = self[nome]
+            if isinstance(valores, memoryview):
+                self.colunas[nome] = array(valores.format, valores.tobytes())
+            elif not isinstance(valores, (list, array)):
+                self.colunas[nome] = list(valores)
+
+    def linha(self, i: int) -> 'Registro':
+        return Registro(self, i)
+
+    def linhas(self):
+        return [Registro(self, i) for i in range(self.tamanho)]
+
+
+class Registro(Mapping):
+    # Visão somente leitura de uma linha: lê direto das colunas da tabela, sem
+    # copiar nada. Quem precisar de um dict de verdade usa dict(registro).
+    __slots__ = ('tabela', 'i')
+
+    def __init__(self, tabela: Tabela, i: int):
+        self.tabela = tabela
+        self.i = i
+
+    def __getitem__(self, coluna):
+        return self.tabela[coluna][self.i]
+
+    def __iter__(self):
+        return iter(self.tabela.nomes)
+
+    def __len__(self):
+        return len(self.tabela.nomes)
+
+    def __repr__(self):
+        return f"Registro({self.tabela.nome!r}, {self.i}, {dict(self)!r})"
+
+
+def parser_da_coluna(file_name: str, nome: str):
+    parser = ESQUEMAS.get(file_name, {}).get(nome)
+    padrao, texto = COLUNAS_PADRAO.get(file_name, (None, set()))
+    if parser is None and nome not in texto:
+        parser = padrao
+    return parser
+
+
+def ler_colunas_brutas(path: str, colunas=None):
+    inicio = time.perf_counter()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        posicoes = [i for i, nome in enumerate(header) if colunas is None or nome in colunas]
+        brutas = [[] for _ in posicoes]
+        tamanho = 0
+        for row in reader:
+            tamanho += 1
+            n = len(row)
+            for col, i in zip(brutas, posicoes):
+                col.append(row[i] if i < n else '')
+        if INSTRUMENTACAO.ativo:
+            INSTRUMENTACAO.registrar(f"csv:{os.path.basename(path)}", time.perf_counter() - inicio, tamanho,
+                                     os.fstat(f.fileno()).st_size)
+    return header, tamanho, {header[i]: col for i, col in zip(posicoes, brutas)}
+
+
+def parsear_coluna(file_name: str, nome: str, valores: list):
+    if INSTRUMENTACAO.ativo:
+        inicio = time.perf_counter()
+        coluna = converter_coluna(file_name, nome, valores)
+        parser = parser_da_coluna(file_name, nome)
+        etapa = f"parser:{parser.__name__}" if parser else "parser:texto"
+        INSTRUMENTACAO.registrar(etapa, time.perf_counter() - inicio, len(valores))
+        return coluna
+    return converter_coluna(file_name, nome, valores)
+
+
+def converter_coluna(file_name: str, nome: str, valores: list):
+    parser = parser_da_coluna(file_name, nome)
+    if parser is None:
+        # times, mapas, fases... se repetem: uma única cópia de cada texto
+        unicos = {}
+        return [unicos.setdefault(v, v) for v in valores]
+    tipo = tipo_cache(file_name, nome)
+    if tipo in ('d', 'q'):
+        # 8 bytes por valor em vez de um objeto float/int por linha
+        try:
+            return array(tipo, map(parser, valores))
+        except OverflowError:
+            pass
+    return [parser(v) for v in valores]
+
+
+def adiar_parsing(file_name: str, brutas: dict) -> dict:
+    # o parsing de cada coluna só acontece quando algum relatório a usa
+    return {
+        nome: lambda nome=nome, valores=valores: parsear_coluna(file_name, nome, valores)
+        for nome, valores in brutas.items()
+    }
+
+
+def carregar_tabela(path: str, file_name: str, colunas=None) -> Tabela:
+    header, tamanho, brutas = ler_colunas_brutas(path, colunas)
+    tabela = Tabela(file_name, {}, header, tamanho)
+    tabela.pendentes.update(adiar_parsing(file_name, brutas))
+    faltantes = [nome for nome in header if nome not in brutas]
+    if faltantes:
+        def carregar():
+            _, n, extras = ler_colunas_brutas(path, faltantes)
+            if n != tamanho:
+                raise ValueError(f"{file_name} mudou durante a leitura; recarregue o Dataset")
+            return adiar_parsing(file_name, extras)
+        tabela.carregar_faltantes = carregar
+    return tabela
+
+
+TAMANHO_BLOCO = 50_000
+
+
+def ler_blocos(path: str, file_name: str, colunas=None, tamanho: int = TAMANHO_BLOCO):
+    # Lê o CSV em pedaços de `tamanho` linhas, já com os tipos do esquema:
+    # só um bloco fica em memória por vez. Arquivo vazio gera um bloco vazio.
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        posicoes = [i for i, nome in enumerate(header) if colunas is None or nome in colunas]
+        nomes = [header[i] for i in posicoes]
+        primeiro = True
+        while True:
+            inicio = time.perf_counter()
+            # cada linha vai direto para as colunas pedidas e é descartada
+            brutas = [[] for _ in posicoes]
+            n = 0
+            for row in itertools.islice(reader, tamanho):
+                n += 1
+                k = len(row)
+                for col, i in zip(brutas, posicoes):
+                    col.append(row[i] if i < k else '')
+            if not n and not primeiro:
+                break
+            if INSTRUMENTACAO.ativo:
+                lidos = os.fstat(f.fileno()).st_size if primeiro else 0
+                INSTRUMENTACAO.registrar(f"csv:{file_name}", time.perf_counter() - inicio, n, lidos)
+            primeiro = False
+            yield Tabela(
+                file_name,
+                {nome: parsear_coluna(file_name, nome, valores) for nome, valores in zip(nomes, brutas)},
+                nomes,
+                n,
+            )
+            if not n:
+                break
+
+
+class ColunaCodificada:
+    def __init__(self, codigos, vocabulario: list):
+        self.codigos = codigos
+        self.vocabulario = vocabulario
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.vocabulario[c] for c in self.codigos[i]]
+        return self.vocabulario[self.codigos[i]]
+
+    def __iter__(self):
+        vocabulario = self.vocabulario
+        return (vocabulario[c] for c in self.codigos)
+
+
+VERSAO_CACHE = 2
+
+
+def tipo_cache(file_name: str, nome: str) -> str:
+    parser = parser_da_coluna(file_name, nome)
+    if parser in (parsear_float, parsear_porcentagem):
+        return 'd'
+    if parser is parsear_int:
+        return 'q'
+    if parser is parsear_lista_agentes:
+        return 'lista'
+    if parser is parsear_tupla_vitorias:
+        return 'tupla'
+    return 'texto'
+
+
+def hash_arquivo(path: str) -> str:
+    import hashlib
+
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def codificar_coluna(valores, tipo: str):
+    codigos = array('i')
+    vocabulario = []
+    posicoes = {}
+    for v in valores:
+        chave = tuple(v) if tipo == 'lista' else v
+        c = posicoes.get(chave)
+        if c is None:
+            c = posicoes[chave] = len(vocabulario)
+            vocabulario.append(list(v) if tipo != 'texto' else v)
+        codigos.append(c)
+    return codigos, vocabulario
+
+
+def gravar_binario(path: str, dados: array):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        dados.tofile(f)
+    # os.replace mantém o inode antigo vivo para quem ainda o tem mapeado.
+    os.replace(tmp, path)
+
+
+def mapear_binario(path: str, tipo: str):
+    import mmap
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return array(tipo)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mm).cast(tipo)
+
+
+@instrumentado('cache')
+def salvar_cache(tabela: Tabela, path: str, destino: str):
+    import json
+
+    os.makedirs(destino, exist_ok=True)
+    meta_path = os.path.join(destino, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    st = os.stat(path)
+    meta = {
+        'versao': VERSAO_CACHE,
+        'tamanho': st.st_size,
+        'mtime': st.st_mtime_ns,
+        'hash': hash_arquivo(path),
+        'linhas': len(tabela),
+        'colunas': [],
+    }
+    for n, nome in enumerate(tabela.nomes):
+        tipo = tipo_cache(tabela.nome, nome)
+        arquivo = f'{n}.bin'
+        vocabulario = None
+        if tipo in ('d', 'q'):
+            dados = array(tipo, tabela[nome])
+        else:
+            dados, vocabulario = codificar_coluna(tabela[nome], tipo)
+        gravar_binario(os.path.join(destino, arquivo), dados)
+        meta['colunas'].append({'nome': nome, 'tipo': tipo, 'arquivo': arquivo, 'vocabulario': vocabulario})
+    tmp = meta_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, meta_path)
+
+
+def cache_valido(meta_path: str, path: str):
+    import json
+
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    st = os.stat(path)
+    if meta.get('versao') != VERSAO_CACHE or meta.get('tamanho') != st.st_size:
+        return None
+    if meta.get('mtime') != st.st_mtime_ns:
+        # mtime mudou mas o conteúdo pode ser o mesmo (cópia, touch).
+        if meta.get('hash') != hash_arquivo(path):
+            return None
+        meta['mtime'] = st.st_mtime_ns
+        tmp = meta_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, meta_path)
+    return meta
+
+
+@instrumentado('cache')
+def abrir_coluna_cache(col: dict, caminho: str):
+    if col['tipo'] in ('d', 'q'):
+        return mapear_binario(caminho, col['tipo'])
+    vocabulario = col['vocabulario']
+    if col['tipo'] == 'tupla':
+        vocabulario = [tuple(v) for v in vocabulario]
+    return ColunaCodificada(mapear_binario(caminho, 'i'), vocabulario)
+
+
+def abrir_cache(meta: dict, file_name: str, destino: str) -> Tabela:
+    tabela = Tabela(file_name, {}, [col['nome'] for col in meta['colunas']], meta['linhas'])
+    for col in meta['colunas']:
+        caminho = os.path.join(destino, col['arquivo'])
+        tabela.pendentes[col['nome']] = lambda col=col, caminho=caminho: abrir_coluna_cache(col, caminho)
+    return tabela
+
+
+def carregar_tabela_com_cache(path: str, file_name: str, cache_dir: str) -> Tabela:
+    destino = os.path.join(cache_dir, file_name)
+    meta = cache_valido(os.path.join(destino, 'meta.json'), path)
+    if meta is not None:
+        return abrir_cache(meta, file_name, destino)
+    tabela = carregar_tabela(path, file_name)
+    salvar_cache(tabela, path, destino)
+    return tabela
+
+
+class CacheResultados:
+    # LRU de resultados de relatórios. Cada entrada guarda a assinatura dos
+    # arquivos que o relatório leu e deixa de valer quando algum deles muda.
+    def __init__(self, tamanho: int = 128):
+        self.tamanho = tamanho
+        self.itens = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave, assinar):
+        item = self.itens.get(chave)
+        if item is not None:
+            resultado, assinatura, arquivos = item
+            if assinar(arquivos) == assinatura:
+                self.itens.move_to_end(chave)
+                self.acertos += 1
+                return resultado
+            del self.itens[chave]
+        self.faltas += 1
+        return None
+
+    def guardar(self, chave, resultado, assinatura, arquivos):
+        self.itens[chave] = (resultado, assinatura, arquivos)
+        self.itens.move_to_end(chave)
+        while len(self.itens) > self.tamanho:
+            self.itens.popitem(last=False)
+
+    def limpar(self):
+        self.itens.clear()
+
+    def estatisticas(self) -> dict:
+        return {'acertos': self.acertos, 'faltas': self.faltas, 'itens': len(self.itens), 'tamanho': self.tamanho}
+
+
+class Dataset:
+    def __init__(self, diretorio: str = None, cache_dir: str = None, bloco: int = None, cache_resultados: int = 128,
+                 sqlite: str = None):
+        self.diretorio = diretorio
+        self.cache_dir = cache_dir if cache_dir is not None else os.environ.get('CHAMPIONS_CACHE_DIR')
+        # com `sqlite`, os relatórios que têm versão SQL consultam esse banco
+        self.sqlite = sqlite if sqlite is not None else os.environ.get('CHAMPIONS_SQLITE')
+        self._banco = None
+        # com `bloco`, relatórios agregados leem os CSVs em pedaços desse tamanho
+        self.bloco = bloco
+        self.resultados = CacheResultados(cache_resultados) if cache_resultados else None
+        # muda a cada anexar()/invalidar(): dados em memória que o mtime não mostra
+        self.versao = 0
+        self._tabelas = {}
+        self._mtimes = {}
+        self._derivados = {}
+        self._eventos = {}
+        # arquivos lidos pelo relatório em execução (ver memorizar)
+        self._lidos = None
+
+    def caminho(self, file_name: str) -> str:
+        if self.diretorio is None:
+            return resolver_caminho(file_name)
+        return os.path.join(self.diretorio, file_name)
+
+    def tabela(self, file_name: str, colunas=None) -> Tabela:
+        # `colunas` é só uma dica para a primeira leitura: as demais colunas
+        # são lidas do arquivo se algum relatório pedir por elas depois.
+        self.registrar_leitura(file_name)
+        path = self.caminho(file_name)
+        mtime = os.stat(path).st_mtime_ns
+        if self._mtimes.get(file_name) != mtime:
+            if self.cache_dir:
+                self._tabelas[file_name] = carregar_tabela_com_cache(path, file_name, self.cache_dir)
+            else:
+                self._tabelas[file_name] = carregar_tabela(path, file_name, colunas)
+            self._mtimes[file_name] = mtime
+        return self._tabelas[file_name]
+
+    def blocos(self, file_name: str, colunas=None):
+        # Sem `bloco` a tabela inteira é o único bloco; assim o mesmo código
+        # de agregação serve para os dois modos.
+        if not self.bloco:
+            yield self.tabela(file_name, colunas)
+            return
+        self.registrar_leitura(file_name)
+        yield from ler_blocos(self.caminho(file_name), file_name, colunas, self.bloco)
+
+    def registros(self, file_name: str, colunas=None):
+        for bloco in self.blocos(file_name, colunas):
+            for i in range(len(bloco)):
+                yield Registro(bloco, i)
+
+    def derivado(self, nome: str, arquivos, construir, atualizar=None, colunas=None, em_blocos: bool = False):
+        # Estruturas calculadas a partir de tabelas (índices, agregados) são
+        # refeitas só quando alguma das tabelas de origem for recarregada.
+        # Com `atualizar(estrutura, file_name, inicio, *tabelas)` elas também
+        # acompanham linhas novas vindas de anexar() sem recomputar tudo.
+        colunas = colunas or {}
+        if self.bloco and em_blocos:
+            return self.derivado_em_blocos(nome, arquivos[0], construir, atualizar, colunas.get(arquivos[0]))
+        tabelas = tuple(self.tabela(f, colunas.get(f)) for f in arquivos)
+        cache = self._derivados.get(nome)
+        if cache is None or any(a is not b for a, b in zip(cache[0], tabelas)):
+            inicio = time.perf_counter()
+            cache = (tabelas, construir(*tabelas), list(arquivos), atualizar)
+            if INSTRUMENTACAO.ativo:
+                INSTRUMENTACAO.registrar(f"derivado:{nome}", time.perf_counter() - inicio, sum(map(len, tabelas)))
+            self._derivados[nome] = cache
+        return cache[1]
+
+    def derivado_em_blocos(self, nome: str, file_name: str, construir, atualizar, colunas=None):
+        # Só para estruturas que são somas linha a linha: o primeiro bloco
+        # cria a estrutura e os seguintes entram via atualizar(..., 0, bloco).
+        self.registrar_leitura(file_name)
+        chave = (os.stat(self.caminho(file_name)).st_mtime_ns,)
+        cache = self._derivados.get(nome)
+        if cache is None or cache[0] != chave:
+            inicio = time.perf_counter()
+            linhas = 0
+            estrutura = None
+            for bloco in self.blocos(file_name, colunas):
+                linhas += len(bloco)
+                if estrutura is None:
+                    estrutura = construir(bloco)
+                else:
+                    atualizar(estrutura, file_name, 0, bloco)
+            if INSTRUMENTACAO.ativo:
+                INSTRUMENTACAO.registrar(f"derivado:{nome}", time.perf_counter() - inicio, linhas)
+            # sem tabelas para atualizar: anexar() descarta e o próximo uso relê
+            cache = (chave, estrutura, [file_name], None)
+            self._derivados[nome] = cache
+        return cache[1]
+
+    def banco(self, *arquivos):
+        # Conexão com as tabelas de `arquivos` (e as derivadas delas) em dia
+        # com os CSVs em disco; linhas de anexar() sem persistir não entram.
+        for file_name in arquivos:
+            self.registrar_leitura(file_name)
+        if self._banco is None:
+            self._banco = BancoSQLite(self.sqlite)
+        return self._banco.sincronizar(self, arquivos)
+
+    def evento(self, diretorio: str) -> 'Dataset':
+        # Dataset de outro evento (outro diretório de CSVs) com as mesmas
+        # opções; cache binário e banco SQLite ficam separados por diretório.
+        import hashlib
+
+        diretorio = os.path.abspath(diretorio)
+        if diretorio not in self._eventos:
+            sufixo = hashlib.sha1(diretorio.encode('utf-8')).hexdigest()[:12]
+            cache_dir = os.path.join(self.cache_dir, sufixo) if self.cache_dir else None
+            sqlite = None
+            if self.sqlite:
+                raiz, extensao = os.path.splitext(self.sqlite)
+                sqlite = f"{raiz}-{sufixo}{extensao}"
+            self._eventos[diretorio] = Dataset(diretorio, cache_dir=cache_dir, bloco=self.bloco,
+                                               cache_resultados=self.resultados.tamanho if self.resultados else 0,
+                                               sqlite=sqlite)
+        return self._eventos[diretorio]
+
+    def registrar_leitura(self, file_name: str):
+        if self._lidos is not None:
+            self._lidos.add(file_name)
+
+    def assinatura(self, arquivos) -> tuple:
+        try:
+            return (self.versao,) + tuple(os.stat(self.caminho(f)).st_mtime_ns for f in arquivos)
+        except OSError:
+            return None
+
+    def memorizar(self, chave, calcular):
+        # `chave` precisa identificar o relatório e seus argumentos já normalizados
+        if self.resultados is None:
+            return calcular()
+        resultado = self.resultados.obter(chave, self.assinatura)
+        if resultado is not None:
+            return resultado
+        anteriores, self._lidos = self._lidos, set()
+        try:
+            resultado = calcular()
+        finally:
+            lidos, self._lidos = self._lidos, anteriores
+            if anteriores is not None:
+                anteriores.update(lidos)
+        arquivos = tuple(sorted(lidos))
+        # o mtime de quando a tabela foi carregada, não o de agora
+        assinatura = (self.versao,) + tuple(
+            self._mtimes[f] if f in self._mtimes else os.stat(self.caminho(f)).st_mtime_ns for f in arquivos)
+        self.resultados.guardar(chave, resultado, assinatura, arquivos)
+        return resultado
+
+    def anexar(self, file_name: str, linhas, persistir: bool = False) -> int:
+        # `linhas` são dicts com os mesmos campos e formato do CSV.
+        if self.bloco:
+            return self.anexar_ao_csv(file_name, linhas, persistir)
+        tabela = self.tabela(file_name)
+        tabela.tornar_mutavel()
+        inicio = len(tabela)
+        novas = []
+        for linha in linhas:
+            brutos = [str(linha.get(nome, '')) for nome in tabela.nomes]
+            for nome, valor in zip(tabela.nomes, brutos):
+                parser = parser_da_coluna(file_name, nome)
+                tabela.colunas[nome].append(parser(valor) if parser else valor)
+            novas.append(brutos)
+        tabela.tamanho += len(novas)
+        if not novas:
+            return 0
+        self.versao += 1
+
+        if persistir:
+            path = self.caminho(file_name)
+            with open(path, 'a', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerows(novas)
+            # o arquivo mudou por nossa causa: não há o que recarregar
+            self._mtimes[file_name] = os.stat(path).st_mtime_ns
+
+        for nome, (tabelas, estrutura, arquivos, atualizar) in list(self._derivados.items()):
+            if file_name not in arquivos:
+                continue
+            if atualizar is None:
+                del self._derivados[nome]
+            else:
+                atualizar(estrutura, file_name, inicio, *tabelas)
+        return len(novas)
+
+    def anexar_ao_csv(self, file_name: str, linhas, persistir: bool) -> int:
+        # Em modo de blocos as agregações releem o CSV e nada fica em memória,
+        # então linhas novas só valem se forem gravadas no arquivo.
+        if not persistir:
+            raise ValueError("com bloco, anexar() só funciona com persistir=True")
+        path = self.caminho(file_name)
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            nomes = next(csv.reader(f))
+        novas = [[str(linha.get(nome, '')) for nome in nomes] for linha in linhas]
+        if not novas:
+            return 0
+        with open(path, 'a', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(novas)
+        # o mtime novo faz tabelas e derivados serem relidos no próximo uso
+        self.versao += 1
+        return len(novas)
+
+    def invalidar(self, file_name: str = None):
+        if file_name is None:
+            self._tabelas.clear()
+            self._mtimes.clear()
+        else:
+            self._tabelas.pop(file_name, None)
+            self._mtimes.pop(file_name, None)
+        self._derivados.clear()
+        self.versao += 1
+
+
+def atualizar_indices_partidas(indices: dict, file_name: str, inicio: int, overview: Tabela):
+    for i in range(inicio, len(overview)):
+        mid = overview['match_id'][i]
+        for t in overview['teams'][i].split(' vs '):
+            indices['partidas_por_time'].setdefault(chave_time(t), []).append(mid)
+
+
+def construir_indices_partidas(overview: Tabela) -> dict:
+    indices = {'partidas_por_time': {}}
+    atualizar_indices_partidas(indices, 'detailed_matches_overview.csv', 0, overview)
+    return indices
+
+
+# colunas lidas pelas estruturas de partidas (índices, resumo e vetos)
+COLUNAS_PARTIDAS = {
+    'detailed_matches_overview.csv': ['match_id', 'teams', 'pick_ban_info'],
+    'detailed_matches_maps.csv': ['match_id', 'map_name', 'score', 'winner', 'picked_by'],
+}
+
+
+def indices_partidas(dataset=None) -> dict:
+    return (dataset or DATASET).derivado(
+        'indices_partidas',
+        ['detailed_matches_overview.csv'],
+        construir_indices_partidas,
+        atualizar_indices_partidas,
+        COLUNAS_PARTIDAS,
+    )
+
+
+CENARIOS_PICK = ['proprio_pick', 'pick_adversario', 'decider']
+
+
+def resumo_time_vazio() -> dict:
+    resumo = {}
+    for cenario in CENARIOS_PICK:
+        resumo[cenario] = {'wins': 0, 'total': 0, 'mapas': []}
+    return resumo
+
+
+def registrar_mapa(resumo: dict, mapas: Tabela, i: int):
+    mid = mapas['match_id'][i]
+    t1, t2 = resumo['times_por_partida'][mid]
+    a1, a2 = chave_time(t1), chave_time(t2)
+    winner = chave_time(mapas['winner'][i])
+    picked_by = mapas['picked_by'][i].strip()
+    por_time = resumo['por_time']
+
+    for time in (a1, a2):
+        if picked_by.lower() == 'decider':
+            cenario = por_time[time]['decider']
+        elif chave_time(picked_by) == time:
+            cenario = por_time[time]['proprio_pick']
+        else:
+            cenario = por_time[time]['pick_adversario']
+        cenario['total'] += 1
+        if winner == time:
+            cenario['wins'] += 1
+        cenario['mapas'].append(i)
+
+
+def atualizar_resumo_partidas(resumo: dict, file_name: str, inicio: int, overview: Tabela, mapas: Tabela):
+    if file_name == 'detailed_matches_overview.csv':
+        for i in range(inicio, len(overview)):
+            mid = overview['match_id'][i]
+            t1, t2 = [t.strip() for t in overview['teams'][i].split(' vs ')]
+            resumo['times_por_partida'][mid] = (t1, t2)
+            for t in (t1, t2):
+                resumo['por_time'].setdefault(chave_time(t), resumo_time_vazio())
+            # mapas que chegaram antes da partida
+            for j in resumo['mapas_pendentes'].pop(mid, []):
+                registrar_mapa(resumo, mapas, j)
+    elif file_name == 'detailed_matches_maps.csv':
+        for i in range(inicio, len(mapas)):
+            mid = mapas['match_id'][i]
+            if mid in resumo['times_por_partida']:
+                registrar_mapa(resumo, mapas, i)
+            else:
+                resumo['mapas_pendentes'].setdefault(mid, []).append(i)
+
+
+def construir_resumo_partidas(overview: Tabela, mapas: Tabela) -> dict:
+    resumo = {
+        'times_por_partida': {},
+        'por_time': {},
+        'mapas_pendentes': {},
+    }
+    atualizar_resumo_partidas(resumo, 'detailed_matches_overview.csv', 0, overview, mapas)
+    atualizar_resumo_partidas(resumo, 'detailed_matches_maps.csv', 0, overview, mapas)
+    return resumo
+
+
+def resumo_partidas(dataset=None) -> dict:
+    return (dataset or DATASET).derivado(
+        'resumo_partidas',
+        ['detailed_matches_overview.csv', 'detailed_matches_maps.csv'],
+        construir_resumo_partidas,
+        atualizar_resumo_partidas,
+        COLUNAS_PARTIDAS,
+    )
+
+
+COLUNAS_CLASSIFICACAO = {'matches.csv': ['team1', 'score1', 'team2', 'score2', 'winner', 'status', 'week', 'stage']}
+
+# "Decider (C)" -> "Decider": rodadas de grupos diferentes contam como a mesma fase
+PADRAO_GRUPO = re.compile(r"^\s*(?P<fase>.*?)\s*\((?P<grupo>[^)]*)\)\s*$")
+PADRAO_RODADA_INFERIOR = re.compile(r"^Lower Round (\d+)$")
+
+NOMES_FASES = {
+    'Grand Final': 'Grande Final',
+    'Lower Final': 'Final Inferior (Lower Final)',
+    'Upper Final': 'Final Superior (Upper Final)',
+    'Upper Semifinals': 'Semifinal Superior (Upper Semifinals)',
+    'Upper Quarterfinals': 'Quarta de Final Superior (Upper Quarterfinals)',
+}
+
+# Padrões do Champions (grupos e playoffs em dupla eliminação, Grande Final
+# sem reset de chave); ranking --derrotas/--final muda isso por evento.
+DERROTAS_ELIMINACAO = 2
+FASE_FINAL = 'Grand Final'
+
+
+def fase_da_rodada(week: str) -> str:
+    grupo = PADRAO_GRUPO.match(week)
+    return grupo['fase'] if grupo else week.strip()
+
+
+def descrever_fase(week: str, stage: str) -> str:
+    week = week.strip()
+    if stage.strip().lower() == 'group stage':
+        grupo = PADRAO_GRUPO.match(week)
+        return f"Fase de Grupos ({grupo['fase']} {grupo['grupo']})" if grupo else f"Fase de Grupos ({week})"
+    inferior = PADRAO_RODADA_INFERIOR.match(week)
+    if inferior:
+        return f"Rodada {inferior[1]} Inferior ({week})"
+    return NOMES_FASES.get(week, week)
+
+
+def classificacao_vazia() -> dict:
+    # times: nome -> séries/mapas W-L e a última partida jogada;
+    # rodadas: fase -> linha da última partida dela (ordem cronológica do CSV)
+    return {'times': {}, 'rodadas': {}}
+
+
+def registrar_partida(classificacao: dict, linha: int, t1: str, s1: int, t2: str, s2: int, vencedor: str,
+                      week: str, stage: str):
+    t1, t2, vencedor = t1.strip(), t2.strip(), vencedor.strip()
+    if vencedor not in (t1, t2):
+        vencedor = t1 if s1 > s2 else t2 if s2 > s1 else None
+    if vencedor is None:
+        return
+    fase = fase_da_rodada(week)
+    classificacao['rodadas'][fase] = linha
+    placar = f"{max(s1, s2)}-{min(s1, s2)}"
+    for time, adversario, pro, contra in ((t1, t2, s1, s2), (t2, t1, s2, s1)):
+        dados = classificacao['times'].setdefault(
+            time, {'series_wins': 0, 'series_losses': 0, 'maps_wins': 0, 'maps_losses': 0, 'derrotas': Counter(),
+                   'ultima': None})
+        venceu = time == vencedor
+        dados['series_wins' if venceu else 'series_losses'] += 1
+        dados['maps_wins'] += pro
+        dados['maps_losses'] += contra
+        if not venceu:
+            dados['derrotas'][stage.strip()] += 1
+        dados['ultima'] = {'linha': linha, 'fase': fase, 'week': week, 'stage': stage, 'venceu': venceu,
+                           'derrotas_estagio': dados['derrotas'][stage.strip()],
+                           'adversario': adversario, 'placar': placar}
+
+
+def atualizar_classificacao(classificacao: dict, file_name: str, inicio: int, partidas: Tabela):
+    for i in range(inicio, len(partidas)):
+        if partidas['status'][i].strip().lower() != 'completed':
+            continue
+        registrar_partida(classificacao, i, partidas['team1'][i], partidas['score1'][i], partidas['team2'][i],
+                          partidas['score2'][i], partidas['winner'][i], partidas['week'][i], partidas['stage'][i])
+
+
+def construir_classificacao(partidas: Tabela) -> dict:
+    classificacao = classificacao_vazia()
+    atualizar_classificacao(classificacao, 'matches.csv', 0, partidas)
+    return classificacao
+
+
+def classificacao_evento(dataset=None) -> dict:
+    ds = dataset or DATASET
+    if ds.sqlite:
+        return classificacao_sqlite(ds)
+    return ds.derivado(
+        'classificacao',
+        ['matches.csv'],
+        construir_classificacao,
+        atualizar_classificacao,
+        COLUNAS_CLASSIFICACAO,
+    )
+
+
+def eliminado(ultima: dict, derrotas: int, final: str) -> bool:
+    # a final decide sozinha; nas outras fases vale o limite de derrotas do estágio
+    if ultima['venceu']:
+        return False
+    return ultima['fase'] == final or ultima['derrotas_estagio'] >= derrotas
+
+
+def posicoes_finais(classificacao: dict, derrotas: int = DERROTAS_ELIMINACAO, final: str = FASE_FINAL) -> list:
+    # Times ainda vivos ficam na frente; os eliminados são agrupados pela
+    # fase da eliminação, da mais tardia para a mais cedo, e dividem a faixa
+    # de posições dessa fase.
+    vivos, eliminados = [], {}
+    for time, dados in classificacao['times'].items():
+        ultima = dados['ultima']
+        if eliminado(ultima, derrotas, final):
+            eliminados.setdefault(ultima['fase'], []).append(time)
+        else:
+            vivos.append(time)
+    grupos = [vivos] if vivos else []
+    for fase in sorted(eliminados, key=classificacao['rodadas'].get, reverse=True):
+        grupos.append(eliminados[fase])
+
+    posicoes = []
+    inicio = 1
+    for grupo in grupos:
+        grupo.sort(key=lambda t: classificacao['times'][t]['ultima']['linha'])
+        fim = inicio + len(grupo) - 1
+        pos = f"{inicio}º Lugar" if fim == inicio else f"{inicio}º-{fim}º Lugares"
+        for k, time in enumerate(grupo):
+            ultima = classificacao['times'][time]['ultima']
+            fase = descrever_fase(ultima['week'], ultima['stage'])
+            if eliminado(ultima, derrotas, final):
+                verbo = "Perdeu a" if ultima['week'].strip().endswith('Final') else "Eliminado na"
+                preposicao = "para" if verbo == "Perdeu a" else "por"
+                estagio = f"{verbo} {fase} {preposicao} {ultima['adversario']} ({ultima['placar']})"
+            elif (ultima['venceu'] and ultima['fase'] == final) or len(vivos) == 1:
+                estagio = f"Vencedor da {fase}"
+            elif ultima['venceu']:
+                estagio = f"Na disputa (venceu {fase} contra {ultima['adversario']})"
+            else:
+                estagio = f"Na disputa (perdeu {fase} para {ultima['adversario']})"
+            posicoes.append({'pos': pos if k == 0 else "", 'team': time, 'stage': estagio})
+        inicio = fim + 1
+    return posicoes
+
+
+PADRAO_VETO = re.compile(r"^\s*(?:(?P<time>.+?)\s+(?P<acao>ban|pick)\s+(?P<mapa>.+?)|(?P<restante>.+?)\s+remains)\s*$", re.IGNORECASE)
+
+
+def parsear_vetos(texto: str, ignorados: list = None) -> list:
+    # "XLG ban Lotus; PRX pick Sunset; ...; Ascent remains"
+    # partes que não seguem esse formato vão para `ignorados`, se informado
+    eventos = []
+    for parte in (texto or '').split(';'):
+        m = PADRAO_VETO.match(parte)
+        if not m:
+            if parte.strip() and ignorados is not None:
+                ignorados.append(parte.strip())
+            continue
+        if m.group('restante'):
+            eventos.append({'ordem': len(eventos) + 1, 'time': None, 'acao': 'remains', 'mapa': m.group('restante')})
+        else:
+            eventos.append({
+                'ordem': len(eventos) + 1,
+                'time': chave_time(m.group('time')),
+                'acao': m.group('acao').lower(),
+                'mapa': m.group('mapa'),
+            })
+    return eventos
+
+
+def vetos_time_vazio() -> dict:
+    return {'series': 0, 'primeiro_ban': {}, 'bans': {}, 'picks': {}, 'decider': {'total': 0, 'wins': 0}}
+
+
+def contabilizar_veto(vetos: dict, mid: str, mapa: str):
+    # Chamado quando a escolha do mapa (pick/remains) e o resultado dele
+    # estão ambos disponíveis, não importa qual dos dois chegou primeiro.
+    acao, time = vetos['escolha_mapa'][(mid, mapa)]
+    winner = vetos['resultado_mapa'][(mid, mapa)]
+    if acao == 'pick':
+        pick = vetos['por_time'].setdefault(time, vetos_time_vazio())['picks'].setdefault(
+            mapa, {'total': 0, 'jogados': 0, 'wins': 0})
+        pick['jogados'] += 1
+        if winner == time:
+            pick['wins'] += 1
+    else:
+        vetos['por_mapa'].setdefault(mapa, dict.fromkeys(['bans', 'picks', 'restante', 'restante_jogado'], 0))['restante_jogado'] += 1
+        for time in vetos['times_por_partida'].get(mid, ()):
+            decider = vetos['por_time'].setdefault(time, vetos_time_vazio())['decider']
+            decider['total'] += 1
+            if winner == time:
+                decider['wins'] += 1
+
+
+def atualizar_vetos(vetos: dict, file_name: str, inicio: int, overview: Tabela, mapas: Tabela):
+    if file_name == 'detailed_matches_overview.csv':
+        for i in range(inicio, len(overview)):
+            mid = overview['match_id'][i]
+            ignorados = []
+            eventos = parsear_vetos(overview['pick_ban_info'][i], ignorados)
+            vetos['ignorados'].extend((mid, parte) for parte in ignorados)
+            vetos['eventos_por_partida'][mid] = eventos
+            times = tuple(chave_time(t) for t in overview['teams'][i].split(' vs '))
+            vetos['times_por_partida'][mid] = times
+            if eventos:
+                for time in times:
+                    vetos['por_time'].setdefault(time, vetos_time_vazio())['series'] += 1
+            primeiro_ban = set()
+            for ev in eventos:
+                mapa = ev['mapa']
+                por_mapa = vetos['por_mapa'].setdefault(mapa, dict.fromkeys(['bans', 'picks', 'restante', 'restante_jogado'], 0))
+                if ev['acao'] == 'remains':
+                    por_mapa['restante'] += 1
+                else:
+                    por_time = vetos['por_time'].setdefault(ev['time'], vetos_time_vazio())
+                    if ev['acao'] == 'ban':
+                        por_mapa['bans'] += 1
+                        por_time['bans'][mapa] = por_time['bans'].get(mapa, 0) + 1
+                        if ev['time'] not in primeiro_ban:
+                            primeiro_ban.add(ev['time'])
+                            por_time['primeiro_ban'][mapa] = por_time['primeiro_ban'].get(mapa, 0) + 1
+                    else:
+                        por_mapa['picks'] += 1
+                        por_time['picks'].setdefault(mapa, {'total': 0, 'jogados': 0, 'wins': 0})['total'] += 1
+                if ev['acao'] in ('pick', 'remains'):
+                    chave = (mid, mapa)
+                    vetos['escolha_mapa'][chave] = (ev['acao'], ev['time'])
+                    if chave in vetos['resultado_mapa']:
+                        contabilizar_veto(vetos, mid, mapa)
+    elif file_name == 'detailed_matches_maps.csv':
+        for i in range(inicio, len(mapas)):
+            chave = (mapas['match_id'][i], mapas['map_name'][i].strip())
+            vetos['resultado_mapa'][chave] = chave_time(mapas['winner'][i])
+            if chave in vetos['escolha_mapa']:
+                contabilizar_veto(vetos, *chave)
+
+
+def construir_vetos(overview: Tabela, mapas: Tabela) -> dict:
+    vetos = {
+        'eventos_por_partida': {},
+        'times_por_partida': {},
+        'escolha_mapa': {},
+        'resultado_mapa': {},
+        'por_time': {},
+        'por_mapa': {},
+        # (match_id, trecho) de pick_ban_info que não foi reconhecido
+        'ignorados': [],
+    }
+    atualizar_vetos(vetos, 'detailed_matches_maps.csv', 0, overview, mapas)
+    atualizar_vetos(vetos, 'detailed_matches_overview.csv', 0, overview, mapas)
+    return vetos
+
+
+def analise_vetos(dataset=None) -> dict:
+    return (dataset or DATASET).derivado(
+        'vetos',
+        ['detailed_matches_overview.csv', 'detailed_matches_maps.csv'],
+        construir_vetos,
+        atualizar_vetos,
+        COLUNAS_PARTIDAS,
+    )
+
+
+COLUNAS_ECONOMIA = [
+    ('eco', 'Eco (won)'),
+    ('semi_eco', 'Semi-eco (won)'),
+    ('semi_buy', 'Semi-buy (won)'),
+    ('full_buy', 'Full buy(won)'),
+]
+
+LEITURA_ECONOMIA = {
+    'economy_data.csv': ['match_id', 'map', 'Team', 'Pistol Won'] + [coluna for _, coluna in COLUNAS_ECONOMIA],
+}
+
+
+def totais_economia_vazios() -> dict:
+    total = {'pistol_won': 0, 'mapas': 0}
+    for nome, _ in COLUNAS_ECONOMIA:
+        total[nome + '_total'] = 0
+        total[nome + '_wins'] = 0
+    return total
+
+
+def somar_economia(total: dict, econ: Tabela, i: int):
+    total['pistol_won'] += econ['Pistol Won'][i]
+    total['mapas'] += 1
+    for nome, coluna in COLUNAS_ECONOMIA:
+        t, w = econ[coluna][i]
+        total[nome + '_total'] += t
+        total[nome + '_wins'] += w
+
+
+def atualizar_agregados_economia(agregados: dict, file_name: str, inicio: int, econ: Tabela):
+    por_time = agregados['por_time']
+    por_time_mapa = agregados['por_time_mapa']
+    for i in range(inicio, len(econ)):
+        team = econ['Team'][i].strip().upper()
+        chave_mapa = (team, econ['map'][i].strip())
+        if team not in por_time:
+            por_time[team] = totais_economia_vazios()
+        if chave_mapa not in por_time_mapa:
+            por_time_mapa[chave_mapa] = totais_economia_vazios()
+        somar_economia(por_time[team], econ, i)
+        somar_economia(por_time_mapa[chave_mapa], econ, i)
+
+
+def construir_agregados_economia(econ: Tabela) -> dict:
+    agregados = {'por_time': {}, 'por_time_mapa': {}}
+    atualizar_agregados_economia(agregados, 'economy_data.csv', 0, econ)
+    return agregados
+
+
+def linha_resumo_economia(confrontos: dict, econ: Tabela, i: int) -> bool:
+    # Depois dos mapas de cada série vem uma linha de resumo por time, às vezes
+    # rotulada 'All Maps', às vezes com nome de mapa ('ascent', 'for'). Sem o
+    # rótulo, ela é a que repete a soma dos mapas anteriores do time na série.
+    mapa = econ['map'][i].strip()
+    chave = (econ['match_id'][i], econ['Team'][i].strip().upper())
+    linha = totais_economia_vazios()
+    somar_economia(linha, econ, i)
+    anteriores = confrontos['por_serie'].get(chave)
+    if mapa == 'All Maps' or (anteriores is not None and anteriores['mapas'] >= 2
+                              and all(linha[k] == anteriores[k] for k in linha if k != 'mapas')):
+        return True
+    if anteriores is None:
+        anteriores = confrontos['por_serie'][chave] = totais_economia_vazios()
+    somar_economia(anteriores, econ, i)
+    return False
+
+
+def atualizar_confrontos_economia(confrontos: dict, file_name: str, inicio: int, econ: Tabela):
+    # Cada (match_id, mapa) tem uma linha por time; a segunda linha que chega
+    # fecha o par e os dois lados entram na matriz na mesma passada. As linhas
+    # de resumo da série ficam de fora, senão cada mapa contaria duas vezes.
+    pendentes = confrontos['pendentes']
+    for i in range(inicio, len(econ)):
+        mapa = econ['map'][i].strip()
+        chave = (econ['match_id'][i], mapa)
+        resumo = linha_resumo_economia(confrontos, econ, i)
+        par = pendentes.pop(chave, None)
+        if par is None:
+            pendentes[chave] = (i, resumo)
+            continue
+        j, resumo_j = par
+        if resumo or resumo_j:
+            continue
+        a, b = econ['Team'][j].strip().upper(), econ['Team'][i].strip().upper()
+        for time, adversario, linha in ((a, b, j), (b, a, i)):
+            do_mapa = confrontos['por_confronto_mapa'].setdefault(mapa, {})
+            for destino, k in ((confrontos['por_confronto'], (time, adversario)), (do_mapa, (time, adversario))):
+                if k not in destino:
+                    destino[k] = totais_economia_vazios()
+                somar_economia(destino[k], econ, linha)
+
+
+def construir_confrontos_economia(econ: Tabela) -> dict:
+    confrontos = {'por_confronto': {}, 'por_confronto_mapa': {}, 'por_serie': {}, 'pendentes': {}}
+    atualizar_confrontos_economia(confrontos, 'economy_data.csv', 0, econ)
+    return confrontos
+
+
+def confrontos_economia(dataset=None) -> dict:
+    return (dataset or DATASET).derivado(
+        'confrontos_economia', ['economy_data.csv'], construir_confrontos_economia, atualizar_confrontos_economia,
+        LEITURA_ECONOMIA)
+
+
+def agregados_economia(dataset=None) -> dict:
+    return (dataset or DATASET).derivado(
+        'agregados_economia', ['economy_data.csv'], construir_agregados_economia, atualizar_agregados_economia,
+        LEITURA_ECONOMIA, em_blocos=True)
+
+
+def totais_economia(team: str, mapa: str = None, dataset=None) -> dict:
+    ds = dataset or DATASET
+    abbr = get_team_abbr(team).upper()
+    if ds.sqlite:
+        return totais_economia_sqlite(abbr, mapa, ds)
+    agregados = agregados_economia(ds)
+    if mapa is None:
+        total = agregados['por_time'].get(abbr)
+    else:
+        total = agregados['por_time_mapa'].get((abbr, mapa.strip()))
+    return total if total is not None else totais_economia_vazios()
+
+
+COLUNAS_PERFORMANCE = ['2K', '3K', '4K', '5K', '1v1', '1v2', '1v3', '1v4', '1v5', 'ECON', 'PL', 'DE']
+
+# agrupamento -> coluna(s) de performance_data.csv que formam a chave
+CHAVES_PERFORMANCE = {
+    'por_jogador': 'Player',
+    'por_time': 'Team',
+    'por_agente': 'Agent',
+    'por_mapa': 'Map',
+}
+
+
+def atualizar_agregados_performance(agregados: dict, file_name: str, inicio: int, perf: Tabela):
+    colunas = [(nome, perf[nome]) for nome in COLUNAS_PERFORMANCE]
+    chaves = [(agregados[grupo], perf[coluna]) for grupo, coluna in CHAVES_PERFORMANCE.items()]
+    for i in range(inicio, len(perf)):
+        for destino, coluna in chaves:
+            chave = coluna[i].strip()
+            total = destino.get(chave)
+            if total is None:
+                total = destino[chave] = dict.fromkeys(['n'] + COLUNAS_PERFORMANCE, 0)
+            total['n'] += 1
+            for nome, valores in colunas:
+                total[nome] += valores[i]
+
+
+def construir_agregados_performance(perf: Tabela) -> dict:
+    agregados = {grupo: {} for grupo in CHAVES_PERFORMANCE}
+    atualizar_agregados_performance(agregados, 'performance_data.csv', 0, perf)
+    return agregados
+
+
+def agregados_performance(dataset=None) -> dict:
+    return (dataset or DATASET).derivado(
+        'agregados_performance', ['performance_data.csv'], construir_agregados_performance,
+        atualizar_agregados_performance,
+        {'performance_data.csv': COLUNAS_PERFORMANCE + list(CHAVES_PERFORMANCE.values())},
+        em_blocos=True)
+
+
+COLUNAS_MAPA_JOGADOR = ['rating', 'acs', 'k', 'd', 'a', 'kast', 'adr', 'hs_percent', 'fk', 'fd']
+
+# agrupamento -> chave montada a partir de (jogador, time, agente, mapa)
+AGRUPAMENTOS_MAPAS = {
+    'jogador-mapa': lambda jogador, time, agente, mapa: (jogador, mapa),
+    'jogador-agente': lambda jogador, time, agente, mapa: (jogador, agente),
+    'time-mapa': lambda jogador, time, agente, mapa: (time, mapa),
+}
+
+LEITURA_MAPAS_JOGADORES = {
+    'detailed_matches_player_stats.csv':
+        ['stat_type', 'player_name', 'player_team', 'agent', 'map_name', 'map_winner'] + COLUNAS_MAPA_JOGADOR,
+}
+
+
+def atualizar_estatisticas_mapas(estatisticas: dict, file_name: str, inicio: int, stats: Tabela):
+    colunas = [(nome, stats[nome]) for nome in COLUNAS_MAPA_JOGADOR]
+    ratings = stats['rating']
+    grupos = [(estatisticas[nome], montar) for nome, montar in AGRUPAMENTOS_MAPAS.items()]
+    tipos, mapas, agentes = stats['stat_type'], stats['map_name'], stats['agent']
+    jogadores, times, vencedores = stats['player_name'], stats['player_team'], stats['map_winner']
+    chaves_time = estatisticas['chaves_time']
+
+    def abreviar(nome):
+        # nomes de time se repetem em toda linha; resolve cada um uma vez só
+        abbr = chaves_time.get(nome)
+        if abbr is None:
+            abbr = chaves_time[nome] = chave_time(nome)
+        return abbr
+
+    for i in range(inicio, len(stats)):
+        mapa = mapas[i].strip()
+        # as linhas 'overall' resumem a série inteira e não têm mapa
+        if tipos[i] != 'map' or not mapa:
+            continue
+        time = abreviar(times[i])
+        agente = agentes[i][0] if agentes[i] else ''
+        venceu = abreviar(vencedores[i]) == time
+        jogador = jogadores[i].strip()
+        for destino, montar in grupos:
+            chave = montar(jogador, time, agente, mapa)
+            total = destino.get(chave)
+            if total is None:
+                total = destino[chave] = dict.fromkeys(['n', 'wins'] + COLUNAS_MAPA_JOGADOR, 0)
+                # rating -> ocorrências, para os percentis sem guardar as linhas
+                total['ratings'] = Counter()
+            total['n'] += 1
+            total['wins'] += venceu
+            total['ratings'][ratings[i]] += 1
+            for nome, valores in colunas:
+                total[nome] += valores[i]
+
+
+def construir_estatisticas_mapas(stats: Tabela) -> dict:
+    estatisticas = {nome: {} for nome in AGRUPAMENTOS_MAPAS}
+    estatisticas['chaves_time'] = {}
+    atualizar_estatisticas_mapas(estatisticas, 'detailed_matches_player_stats.csv', 0, stats)
+    return estatisticas
+
+
+def estatisticas_mapas(dataset=None) -> dict:
+    return (dataset or DATASET).derivado(
+        'estatisticas_mapas', ['detailed_matches_player_stats.csv'], construir_estatisticas_mapas,
+        atualizar_estatisticas_mapas, LEITURA_MAPAS_JOGADORES, em_blocos=True)
+
+
+def ingerir(file_name: str, linhas, dataset=None, persistir: bool = False) -> int:
+    return (dataset or DATASET).anexar(file_name, linhas, persistir)
+
+
+def construir_indice_agentes(jogadores: Tabela) -> dict:
+    jogadores_por_agente = {}
+    for i, agent_list in enumerate(jogadores['agents']):
+        for agente in {a.lower() for a in agent_list}:
+            jogadores_por_agente.setdefault(agente, []).append(i)
+    return jogadores_por_agente
+
+
+def indice_agentes(dataset=None) -> dict:
+    return (dataset or DATASET).derivado(
+        'indice_agentes', ['player_stats.csv'], construir_indice_agentes, colunas={'player_stats.csv': ['agents']})
+
+
+# Backend SQLite opcional: cada CSV vira uma tabela (nome do arquivo sem
+# .csv) com os tipos do esquema, e o banco é reimportado arquivo a arquivo
+# quando o CSV muda. Vários processos podem reaproveitar o mesmo arquivo.
+TIPOS_SQLITE = {'d': 'REAL', 'q': 'INTEGER', 'lista': 'TEXT', 'texto': 'TEXT'}
+
+# colunas extras com a chave normalizada, usadas nos filtros
+CHAVES_SQLITE = {
+    'economy_data.csv': {'team_key': ('Team', lambda v: v.strip().upper()), 'map_key': ('map', str.strip)},
+}
+
+# índices por match_id, time, jogador e mapa (só os que existirem no arquivo)
+INDICES_SQLITE = {
+    'player_stats.csv': [['team'], ['player_name']],
+    'economy_data.csv': [['match_id'], ['team_key', 'map_key']],
+    'detailed_matches_overview.csv': [['match_id']],
+    'detailed_matches_maps.csv': [['match_id'], ['map_name']],
+    'performance_data.csv': [['Match ID'], ['Team'], ['Player'], ['Map']],
+    'detailed_matches_player_stats.csv': [['match_id'], ['player_team'], ['player_name'], ['map_name']],
+    'matches.csv': [['match_id'], ['team1'], ['team2']],
+}
+
+# tabelas montadas a partir de outras: nome -> arquivos de origem
+DERIVADAS_SQLITE = {
+    'partidas': ['detailed_matches_overview.csv', 'detailed_matches_maps.csv'],
+    'agentes': ['player_stats.csv'],
+}
+
+
+def citar(nome: str) -> str:
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def nome_tabela(file_name: str) -> str:
+    return os.path.splitext(file_name)[0]
+
+
+def importar_tabela_sqlite(con, tabela: Tabela, file_name: str):
+    colunas = []
+    for nome in tabela.nomes:
+        tipo = tipo_cache(file_name, nome)
+        valores = tabela[nome]
+        if tipo == 'tupla':
+            colunas.append((nome + ':total', 'INTEGER', [v[0] for v in valores]))
+            colunas.append((nome + ':wins', 'INTEGER', [v[1] for v in valores]))
+        elif tipo == 'lista':
+            colunas.append((nome, 'TEXT', [', '.join(v) for v in valores]))
+        else:
+            colunas.append((nome, TIPOS_SQLITE[tipo], valores))
+    for chave, (origem, normalizar) in CHAVES_SQLITE.get(file_name, {}).items():
+        colunas.append((chave, 'TEXT', [normalizar(v) for v in tabela[origem]]))
+
+    nome = citar(nome_tabela(file_name))
+    con.execute(f"DROP TABLE IF EXISTS {nome}")
+    definicoes = ', '.join(f"{citar(c)} {tipo}" for c, tipo, _ in colunas)
+    con.execute(f"CREATE TABLE {nome} (linha INTEGER PRIMARY KEY, {definicoes})")
+    marcadores = ', '.join('?' * (len(colunas) + 1))
+    con.executemany(f"INSERT INTO {nome} VALUES ({marcadores})",
+                    zip(range(len(tabela)), *(valores for _, _, valores in colunas)))
+    existentes = {c for c, _, _ in colunas}
+    for indice in INDICES_SQLITE.get(file_name, []):
+        if all(c in existentes for c in indice):
+            nome_indice = citar(nome_tabela(file_name) + '_' + '_'.join(indice))
+            con.execute(f"CREATE INDEX {nome_indice} ON {nome} ({', '.join(map(citar, indice))})")
+
+
+def importar_partidas_sqlite(con, dataset):
+    # Um registro por time em cada mapa, com o cenário de pick já resolvido
+    # pela mesma lógica de resumo_partidas().
+    resumo = resumo_partidas(dataset)
+    mapas = dataset.tabela('detailed_matches_maps.csv')
+    con.execute("DROP TABLE IF EXISTS partidas_time")
+    con.execute("CREATE TABLE partidas_time (match_id TEXT, team_key TEXT, team TEXT)")
+    con.executemany("INSERT INTO partidas_time VALUES (?, ?, ?)", (
+        (mid, chave_time(t), t) for mid, times in resumo['times_por_partida'].items() for t in times))
+    con.execute("CREATE INDEX partidas_time_team_key ON partidas_time (team_key)")
+
+    linhas = []
+    for time, dados in resumo['por_time'].items():
+        for cenario in CENARIOS_PICK:
+            for ordem, i in enumerate(dados[cenario]['mapas']):
+                mid = mapas['match_id'][i]
+                t1, t2 = resumo['times_por_partida'][mid]
+                adversario = t2 if chave_time(t1) == time else t1
+                linhas.append((i, ordem, mid, time, adversario, cenario, int(chave_time(mapas['winner'][i]) == time)))
+    con.execute("DROP TABLE IF EXISTS mapas_time")
+    con.execute("CREATE TABLE mapas_time (linha INTEGER, ordem INTEGER, match_id TEXT, team_key TEXT, "
+                "adversario TEXT, cenario TEXT, venceu INTEGER)")
+    con.executemany("INSERT INTO mapas_time VALUES (?, ?, ?, ?, ?, ?, ?)", linhas)
+    con.execute("CREATE INDEX mapas_time_team_key ON mapas_time (team_key, cenario)")
+    con.execute("CREATE INDEX mapas_time_match_id ON mapas_time (match_id)")
+
+
+def importar_agentes_sqlite(con, dataset):
+    jogadores = dataset.tabela('player_stats.csv')
+    con.execute("DROP TABLE IF EXISTS agentes_jogador")
+    con.execute("CREATE TABLE agentes_jogador (linha INTEGER, agente TEXT)")
+    con.executemany("INSERT INTO agentes_jogador VALUES (?, ?)", (
+        (i, agente) for i, agentes in enumerate(jogadores['agents']) for agente in {a.lower() for a in agentes}))
+    con.execute("CREATE INDEX agentes_jogador_agente ON agentes_jogador (agente)")
+
+
+IMPORTAR_DERIVADAS_SQLITE = {
+    'partidas': importar_partidas_sqlite,
+    'agentes': importar_agentes_sqlite,
+}
+
+
+def totais_economia_sqlite(abbr: str, mapa: str, dataset) -> dict:
+    con = dataset.banco('economy_data.csv')
+    campos = ['count(*)', 'sum("Pistol Won")']
+    for _, coluna in COLUNAS_ECONOMIA:
+        campos += [f"sum({citar(coluna + ':total')})", f"sum({citar(coluna + ':wins')})"]
+    sql = f"SELECT {', '.join(campos)} FROM economy_data WHERE team_key = ?"
+    parametros = [abbr]
+    if mapa is not None:
+        sql += " AND map_key = ?"
+        parametros.append(mapa.strip())
+    n, pistol, *somas = con.execute(sql, parametros).fetchone()
+    total = totais_economia_vazios()
+    if n:
+        total['pistol_won'] = pistol
+        total['mapas'] = n
+        for k, (nome, _) in enumerate(COLUNAS_ECONOMIA):
+            total[nome + '_total'] = somas[2 * k]
+            total[nome + '_wins'] = somas[2 * k + 1]
+    return total
+
+
+def especialistas_sqlite(alvo: str, dataset, k: int = 5) -> list:
+    con = dataset.banco('player_stats.csv')
+    return con.execute(
+        "SELECT p.player_name, p.team, p.kast, p.rating, p.acs FROM agentes_jogador a "
+        "JOIN player_stats p ON p.linha = a.linha WHERE a.agente = ? "
+        "ORDER BY p.kast DESC, p.rating DESC, p.acs DESC, p.linha LIMIT ?", (alvo, k)).fetchall()
+
+
+def cenarios_pick_sqlite(chave: str, dataset):
+    con = dataset.banco('detailed_matches_overview.csv', 'detailed_matches_maps.csv')
+    if con.execute("SELECT 1 FROM partidas_time WHERE team_key = ? LIMIT 1", (chave,)).fetchone() is None:
+        return None
+    cenarios = {cenario: {'wins': 0, 'total': 0, 'detalhes': []} for cenario in CENARIOS_PICK}
+    for cenario, mapa, adversario, score, venceu, picked_by in con.execute(
+            "SELECT t.cenario, m.map_name, t.adversario, m.score, t.venceu, m.picked_by FROM mapas_time t "
+            "JOIN detailed_matches_maps m ON m.linha = t.linha WHERE t.team_key = ? ORDER BY t.ordem", (chave,)):
+        dados = cenarios[cenario]
+        dados['total'] += 1
+        dados['wins'] += venceu
+        dados['detalhes'].append(
+            {'map': mapa, 'opponent': adversario, 'score': score, 'result': "V" if venceu else "D",
+             'picked_by': picked_by.strip()})
+    return cenarios
+
+
+def classificacao_sqlite(dataset) -> dict:
+    # mesma passada de classificacao_evento(), lendo as partidas do banco
+    con = dataset.banco('matches.csv')
+    classificacao = classificacao_vazia()
+    for linha in con.execute(
+            "SELECT linha, team1, score1, team2, score2, winner, week, stage FROM matches "
+            "WHERE lower(trim(status)) = 'completed' ORDER BY linha"):
+        registrar_partida(classificacao, *linha)
+    return classificacao
+
+
+def medias_times_sqlite(dataset) -> dict:
+    con = dataset.banco('player_stats.csv')
+    return {
+        time: {'n': n, 'rating': rating, 'acs': acs, 'kast': kast}
+        for time, n, rating, acs, kast in con.execute(
+            "SELECT team, count(*), avg(rating), avg(acs), avg(kast) FROM player_stats GROUP BY team")
+    }
+
+
+class BancoSQLite:
+    def __init__(self, path: str):
+        self.path = path
+        self.con = None
+        self.pid = None
+
+    def conexao(self):
+        # conexões SQLite não sobrevivem a um fork: cada processo abre a sua
+        if self.con is None or self.pid != os.getpid():
+            import sqlite3
+
+            # sem transações implícitas: o módulo sqlite3 não cobre DDL com
+            # elas, então importar() abre e fecha as suas explicitamente
+            self.con = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self.pid = os.getpid()
+            self.con.execute("CREATE TABLE IF NOT EXISTS arquivos (nome TEXT PRIMARY KEY, assinatura TEXT)")
+        return self.con
+
+    def sincronizar(self, dataset, arquivos):
+        con = self.conexao()
+        assinaturas = {}
+        for file_name in arquivos:
+            st = os.stat(dataset.caminho(file_name))
+            assinaturas[file_name] = f"{st.st_size}:{st.st_mtime_ns}"
+            if self.assinatura(file_name) != assinaturas[file_name]:
+                self.importar(file_name, assinaturas[file_name],
+                              lambda: importar_tabela_sqlite(con, dataset.tabela(file_name), file_name))
+        for nome, origens in DERIVADAS_SQLITE.items():
+            if not all(f in assinaturas for f in origens):
+                continue
+            assinatura = '|'.join(assinaturas[f] for f in origens)
+            if self.assinatura(nome) != assinatura:
+                self.importar(nome, assinatura, lambda: IMPORTAR_DERIVADAS_SQLITE[nome](con, dataset))
+        return con
+
+    def importar(self, nome: str, assinatura: str, importar):
+        # BEGIN IMMEDIATE pega o lock de escrita antes de conferir a
+        # assinatura de novo: outro processo pode ter importado a mesma
+        # tabela enquanto este esperava.
+        self.con.execute("BEGIN IMMEDIATE")
+        try:
+            if self.assinatura(nome) != assinatura:
+                importar()
+                self.marcar(nome, assinatura)
+        except BaseException:
+            self.con.execute("ROLLBACK")
+            raise
+        self.con.execute("COMMIT")
+
+    def assinatura(self, nome: str):
+        linha = self.con.execute("SELECT assinatura FROM arquivos WHERE nome = ?", (nome,)).fetchone()
+        return linha[0] if linha else None
+
+    def marcar(self, nome: str, assinatura: str):
+        self.con.execute("INSERT OR REPLACE INTO arquivos VALUES (?, ?)", (nome, assinatura))
+
+
+def agrupar_somas(chaves, colunas: dict, mascara=None) -> dict:
+    nomes = list(colunas)
+    valores = [colunas[n] for n in nomes]
+    traduzir = None
+    if isinstance(chaves, ColunaCodificada):
+        traduzir = chaves.vocabulario
+        chaves = chaves.codigos
+    acumulados = {}
+    for i, chave in enumerate(chaves):
+        if mascara is not None and not mascara[i]:
+            continue
+        acc = acumulados.get(chave)
+        if acc is None:
+            acc = acumulados[chave] = [0] * (len(nomes) + 1)
+        acc[0] += 1
+        for j, col in enumerate(valores, start=1):
+            acc[j] += col[i]
+    grupos = {}
+    for k, acc in acumulados.items():
+        grupo = {'n': acc[0]}
+        grupo.update(zip(nomes, acc[1:]))
+        grupos[traduzir[k] if traduzir is not None else k] = grupo
+    return grupos
+
+
+def mesclar_somas(destino: dict, grupos: dict) -> dict:
+    for k, grupo in grupos.items():
+        acc = destino.get(k)
+        if acc is None:
+            destino[k] = grupo
+        else:
+            for nome, v in grupo.items():
+                acc[nome] += v
+    return destino
+
+
+def medias_em_blocos(dataset, file_name: str, chave: str, nomes) -> dict:
+    # média por grupo sobre o arquivo todo, somando bloco a bloco
+    somas = {}
+    for bloco in dataset.blocos(file_name, [chave] + list(nomes)):
+        mesclar_somas(somas, agrupar_somas(bloco[chave], {nome: bloco[nome] for nome in nomes}))
+    for grupo in somas.values():
+        for nome in nomes:
+            grupo[nome] /= grupo['n']
+    return somas
+
+
+def maiores(k: int, itens, chave=None) -> list:
+    # O(n log k) e aceita qualquer iterável; empates ficam na ordem de entrada,
+    # igual a sorted(..., reverse=True)[:k].
+    return heapq.nlargest(k, itens, key=chave)
+
+
+def top_k(k: int, *colunas, mascara=None) -> list:
+    if mascara is None:
+        indices = range(len(colunas[0]))
+    else:
+        indices = (i for i, m in enumerate(mascara) if m)
+    return maiores(k, indices, lambda i: tuple(col[i] for col in colunas))
+
+
+def quantis(valores, n: int = 4, ordenado: bool = False) -> list:
+    # Mesmo resultado de statistics.quantiles(method='exclusive').
+    data = valores if ordenado else sorted(valores)
+    ld = len(data)
+    if ld < 2:
+        from statistics import StatisticsError
+        raise StatisticsError('must have at least two data points')
+    m = ld + 1
+    result = []
+    for i in range(1, n):
+        j = i * m // n
+        j = 1 if j < 1 else ld - 1 if j > ld - 1 else j
+        delta = i * m - j * n
+        result.append((data[j - 1] * (n - delta) + data[j] * delta) / n)
+    return result
+
+
+def quantis_contagem(contagem: dict, n: int = 4) -> list:
+    # quantis() a partir de {valor: ocorrências}. A memória depende só de
+    # quantos valores distintos existem, não do número de linhas.
+    import bisect
+
+    valores = sorted(contagem)
+    acumulado = list(itertools.accumulate(contagem[v] for v in valores))
+    ld = acumulado[-1] if acumulado else 0
+    if ld < 2:
+        from statistics import StatisticsError
+        raise StatisticsError('must have at least two data points')
+
+    def posicao(k):
+        return valores[bisect.bisect_right(acumulado, k)]
+
+    m = ld + 1
+    result = []
+    for i in range(1, n):
+        j = i * m // n
+        j = 1 if j < 1 else ld - 1 if j > ld - 1 else j
+        delta = i * m - j * n
+        result.append((posicao(j - 1) * (n - delta) + posicao(j) * delta) / n)
+    return result
+
+
+def mascara_minimo(valores, limite) -> list:
+    return [v >= limite for v in valores]
+
+
+def combinar_mascaras(*mascaras) -> list:
+    return [all(m) for m in zip(*mascaras)]
+
+
+def limite_quartil(valores, mascara=None) -> float:
+    # 3º quartil entre os valores que passam na máscara (mediana se forem poucos)
+    elegiveis = list(valores) if mascara is None else [v for v, m in zip(valores, mascara) if m]
+    try:
+        return quantis(elegiveis, n=4)[2]
+    except Exception:
+        from statistics import median
+        return median(elegiveis)
+
+
+DATASET = Dataset()
+
+
+# Carregadores antigos: agora só leem do DATASET, que já guarda as colunas
+# tipadas. Cada linha vira um dict próprio, que o chamador pode alterar.
+def ler_csv_dicts(file_name: str):
+    return [dict(r) for r in DATASET.tabela(file_name).linhas()]
+
+
 def carregar_stats_jogadores():
     return ler_csv_dicts('player_stats.csv')
 
@@ -115,159 +1814,239 @@ def carregar_partidas_detalhadas():
     return ler_csv_dicts('detailed_matches_maps.csv')
 
 
-def fazer_tabela(headers, rows):
-    if not headers or not rows:
+FORMATOS_TABELA = ('texto', 'csv', 'jsonl', 'markdown')
+
+
+def escrever_em_blocos(saida, linhas, tamanho: int = 1000):
+    buf = []
+    for linha in linhas:
+        buf.append(linha)
+        if len(buf) >= tamanho:
+            saida.write('\n'.join(buf) + '\n')
+            buf.clear()
+    if buf:
+        saida.write('\n'.join(buf) + '\n')
+
+
+@instrumentado('renderizar')
+def renderizar_tabela(headers, rows, formato: str = 'texto', saida=None, larguras=None, amostra: int = None):
+    # Com `larguras` (fixas) ou `amostra` (mede só as primeiras N linhas) as
+    # linhas restantes são escritas conforme chegam, sem materializar o iterador.
+    if not headers:
         return
-    
+    saida = saida if saida is not None else sys.stdout
     headers = [str(h) for h in headers]
-    rows = [[str(cell) for cell in row] for row in rows]
-    
-    col_widths = []
-    for i, header in enumerate(headers):
-        max_width = len(header)
-        for row in rows:
-            if i < len(row):
-                max_width = max(max_width, len(row[i]))
-        col_widths.append(max_width + 2)
-    
-    def fazer_linha():
-        return "+" + "+".join("-" * width for width in col_widths) + "+"
-    
+    it = iter(rows)
+
+    if formato == 'csv':
+        writer = csv.writer(saida, lineterminator='\n')
+        writer.writerow(headers)
+        writer.writerows(it)
+        return
+    if formato == 'jsonl':
+        import json
+        escrever_em_blocos(saida, (json.dumps(dict(zip(headers, row)), ensure_ascii=False, default=str) for row in it))
+        return
+    if formato == 'markdown':
+        def md(cells):
+            return "| " + " | ".join(str(c).replace('|', '\\|') for c in cells) + " |"
+        escrever_em_blocos(saida, itertools.chain(
+            [md(headers), "|" + "|".join("---" for _ in headers) + "|"],
+            (md(row) for row in it),
+        ))
+        return
+    if formato != 'texto':
+        raise ValueError(f"Formato desconhecido: {formato}")
+
+    if larguras is not None:
+        col_widths = [w + 2 for w in larguras]
+        primeiras = [[str(cell) for cell in row] for row in itertools.islice(it, 1)]
+    else:
+        col_widths = [len(h) for h in headers]
+        n = len(col_widths)
+        primeiras = []
+        for row in (it if amostra is None else itertools.islice(it, amostra)):
+            cells = [str(cell) for cell in row]
+            for i, cell in enumerate(cells[:n]):
+                if len(cell) > col_widths[i]:
+                    col_widths[i] = len(cell)
+            primeiras.append(cells)
+        col_widths = [w + 2 for w in col_widths]
+    if not primeiras:
+        return
+
+    linha = "+" + "+".join("-" * width for width in col_widths) + "+"
+
     def fazer_row(cells):
-        row_parts = []
-        for i, cell in enumerate(cells):
-            if i < len(col_widths):
-                padded_cell = cell.ljust(col_widths[i] - 1)
-                row_parts.append(padded_cell)
-        return "|" + "|".join(row_parts) + "|"
-    
-    print(fazer_linha())
-    print(fazer_row(headers))
-    print(fazer_linha())
-    for row in rows:
-        print(fazer_row(row))
-    print(fazer_linha())
-
-
-def listar_top10_performance():
-    players = carregar_stats_jogadores()
-    for p in players:
-        p['rating_num'] = parsear_float(p.get('rating'))
-        p['acs_num'] = parsear_float(p.get('acs'))
-        p['kast_num'] = parsear_porcentagem(p.get('kast'))
-    players.sort(key=lambda p: (p['rating_num'], p['acs_num'], p['kast_num']), reverse=True)
+        return "|" + "|".join(cell.ljust(col_widths[i] - 1) for i, cell in enumerate(cells[:len(col_widths)])) + "|"
+
+    escrever_em_blocos(saida, itertools.chain(
+        [linha, fazer_row(headers), linha],
+        (fazer_row(cells) for cells in primeiras),
+        (fazer_row([str(cell) for cell in row]) for row in it),
+        [linha],
+    ))
+
+
+def fazer_tabela(headers, rows):
+    if not headers or not rows:
+        return
+    renderizar_tabela(headers, rows)
+
+
+class Resultado:
+    def __init__(self):
+        self.blocos = []
+
+    def tabela(self, headers, rows):
+        self.blocos.append({'tipo': 'tabela', 'headers': list(headers), 'rows': [list(row) for row in rows]})
+
+    def texto(self, texto: str):
+        self.blocos.append({'tipo': 'texto', 'texto': texto})
+
+    def mostrar(self, formato: str = 'texto', saida=None):
+        saida = saida if saida is not None else sys.stdout
+        for bloco in self.blocos:
+            if bloco['tipo'] == 'tabela':
+                if bloco['rows']:
+                    renderizar_tabela(bloco['headers'], bloco['rows'], formato, saida)
+                    if formato == 'markdown':
+                        saida.write('\n')
+            elif formato == 'csv':
+                for linha in bloco['texto'].strip().splitlines():
+                    saida.write(f"# {linha}\n")
+            elif formato == 'jsonl':
+                import json
+                saida.write(json.dumps({'texto': bloco['texto'].strip()}, ensure_ascii=False) + '\n')
+            elif formato == 'markdown':
+                saida.write(bloco['texto'].strip() + '\n\n')
+            else:
+                saida.write(bloco['texto'] + '\n')
+
+    def emitir(self, mostrar: bool = True):
+        if mostrar:
+            self.mostrar()
+        return self
+
+    def para_dict(self) -> dict:
+        # cópias: o mesmo Resultado pode estar guardado no cache de resultados
+        blocos = []
+        for bloco in self.blocos:
+            if bloco['tipo'] == 'texto':
+                bloco = {'tipo': 'texto', 'texto': bloco['texto'].strip()}
+            else:
+                bloco = {'tipo': 'tabela', 'headers': list(bloco['headers']), 'rows': [list(row) for row in bloco['rows']]}
+            blocos.append(bloco)
+        return {'blocos': blocos}
+
+
+# colunas de player_stats.csv usadas pelos rankings de jogadores e times
+COLUNAS_DESEMPENHO = ['player_name', 'team', 'rating', 'acs', 'kast']
+
+
+@instrumentado('relatorio')
+def listar_top10_performance(dataset=None, mostrar=True):
+    r = Resultado()
+    jogadores = (dataset or DATASET).tabela('player_stats.csv', COLUNAS_DESEMPENHO)
+    rating, acs, kast = jogadores['rating'], jogadores['acs'], jogadores['kast']
     headers = ["Rank", "Jogador", "Time", "Rating", "ACS", "KAST"]
     rows = []
-    for i, p in enumerate(players[:10], start=1):
+    for rank, i in enumerate(top_k(10, rating, acs, kast), start=1):
         rows.append([
-            i,
-            p.get('player_name','?'),
-            p.get('team','?'),
-            f"{p['rating_num']:.2f}",
-            f"{p['acs_num']:.1f}",
-            f"{p['kast_num']:.0f}%",
+            rank,
+            jogadores['player_name'][i],
+            jogadores['team'][i],
+            f"{rating[i]:.2f}",
+            f"{acs[i]:.1f}",
+            f"{kast[i]:.0f}%",
         ])
-    fazer_tabela(headers, rows)
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
 
 
-def top_5_especialistas():
-    players = carregar_stats_jogadores()
-    agente_escolhido = input("Agente: ").strip()
+@instrumentado('relatorio')
+def top_5_especialistas(agente=None, dataset=None, mostrar=True):
+    r = Resultado()
+    ds = dataset or DATASET
+    agente_escolhido = (input("Agente: ") if agente is None else agente).strip()
     alvo = (agente_escolhido or '').strip().lower()
-    candidatos = []
-    for p in players:
-        agents_field = p.get('agents')
-        try:
-            agent_list = ast.literal_eval(agents_field) if agents_field else []
-        except Exception:
-            agent_list = []
-        agent_list_lower = [str(a).lower() for a in agent_list]
-        if alvo and alvo in agent_list_lower:
-            p['kast_num'] = parsear_porcentagem(p.get('kast'))
-            p['rating_num'] = parsear_float(p.get('rating'))
-            p['acs_num'] = parsear_float(p.get('acs'))
-            candidatos.append(p)
-
-    if not candidatos:
-        print(f"Nenhum jogador encontrado que jogue o agente '{agente_escolhido}'.")
-        return
+    if ds.sqlite:
+        melhores = especialistas_sqlite(alvo, ds) if alvo else []
+    else:
+        jogadores = ds.tabela('player_stats.csv', COLUNAS_DESEMPENHO)
+        rating, acs, kast = jogadores['rating'], jogadores['acs'], jogadores['kast']
+        candidatos = indice_agentes(ds).get(alvo, []) if alvo else []
+        melhores = [
+            (jogadores['player_name'][i], jogadores['team'][i], kast[i], rating[i], acs[i])
+            for i in maiores(5, candidatos, lambda i: (kast[i], rating[i], acs[i]))
+        ]
+
+    if not melhores:
+        r.texto(f"Nenhum jogador encontrado que jogue o agente '{agente_escolhido}'.")
+        return r.emitir(mostrar)
 
-    candidatos.sort(key=lambda p: (p['kast_num'], p['rating_num'], p['acs_num']), reverse=True)
     headers = ["Rank", "Jogador", "Time", "KAST", "Rating", "ACS"]
     rows = []
-    for i, p in enumerate(candidatos[:5], start=1):
+    for rank, (nome, team, kast, rating, acs) in enumerate(melhores, start=1):
         rows.append([
-            i,
-            p.get('player_name','?'),
-            p.get('team','?'),
-            f"{parsear_porcentagem(p.get('kast')):.0f}%",
-            f"{parsear_float(p.get('rating')):.2f}",
-            f"{parsear_float(p.get('acs')):.1f}",
+            rank,
+            nome,
+            team,
+            f"{kast:.0f}%",
+            f"{rating:.2f}",
+            f"{acs:.1f}",
         ])
-    fazer_tabela(headers, rows)
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
+
+
+COLUNAS_NAO_MAPA = {'agent_name', 'total_utilization'}
 
 
-def pickrate_por_mapa():
-    stats = carregar_stats_agentes()
-    mapa_escolhido = input("Mapa: ").strip()
+@instrumentado('relatorio')
+def pickrate_por_mapa(mapa=None, dataset=None, mostrar=True):
+    r = Resultado()
+    stats = (dataset or DATASET).tabela('agents_stats.csv')
+    mapa_escolhido = (input("Mapa: ") if mapa is None else mapa).strip()
     mapa_col = (mapa_escolhido or '').strip()
     if not mapa_col:
-        print("Mapa não informado.")
-        return
+        r.texto("Mapa não informado.")
+        return r.emitir(mostrar)
     mapa_norm = mapa_col.strip()
 
-    if not stats or mapa_norm not in stats[0]:
-        disponiveis = [k for k in (stats[0].keys() if stats else []) if k.lower() not in {'agent_name', 'total_utilization'}]
-        print(f"Mapa '{mapa_escolhido}' não encontrado. Mapas disponíveis: {', '.join(disponiveis)}")
-        return
+    # agent_name e total_utilization são colunas da tabela, mas não mapas
+    disponiveis = [k for k in (stats.nomes if len(stats) else []) if k.lower() not in COLUNAS_NAO_MAPA]
+    if mapa_norm not in disponiveis:
+        r.texto(f"Mapa '{mapa_escolhido}' não encontrado. Mapas disponíveis: {', '.join(disponiveis)}")
+        return r.emitir(mostrar)
 
-    linhas = []
-    for row in stats:
-        agent = row.get('agent_name')
-        pick = parsear_float(row.get(mapa_norm))
-        linhas.append((agent, pick))
+    linhas = list(zip(stats['agent_name'], stats[mapa_norm]))
     linhas.sort(key=lambda x: x[1], reverse=True)
 
     headers = [f"Agente ({mapa_norm})", "Pickrate"]
     rows = [[agent, f"{pick:.1f}%"] for agent, pick in linhas]
-    fazer_tabela(headers, rows)
-    print("Winrate por agente no mapa: N/D (não disponível nos dados fornecidos)")
+    r.tabela(headers, rows)
+    r.texto("Winrate por agente no mapa: N/D (não disponível nos dados fornecidos)")
+    return r.emitir(mostrar)
+
 
+def taxa_vitoria(wins: int, total: int) -> float:
+    return (wins / total * 100.0) if total > 0 else 0.0
 
-def comparar_economia_times():
-    time_a = input("Time A: ").strip()
-    time_b = input("Time B: ").strip()
+
+@instrumentado('relatorio')
+def comparar_economia_times(time_a=None, time_b=None, mapa=None, dataset=None, mostrar=True):
+    r = Resultado()
+    time_a = (input("Time A: ") if time_a is None else time_a).strip()
+    time_b = (input("Time B: ") if time_b is None else time_b).strip()
 
     team_a_abbr = get_team_abbr(time_a)
     team_b_abbr = get_team_abbr(time_b)
     
-    econ = carregar_dados_economia()
-    def acumular(team_abbr: str):
-        filtro = [r for r in econ if str(r.get('Team','')).strip().upper() == team_abbr.upper()]
-        total = {
-            'pistol_won': 0,
-            'eco_total': 0, 'eco_wins': 0,
-            'semi_eco_total': 0, 'semi_eco_wins': 0,
-            'semi_buy_total': 0, 'semi_buy_wins': 0,
-            'full_buy_total': 0, 'full_buy_wins': 0,
-        }
-        for r in filtro:
-            total['pistol_won'] += parsear_int(r.get('Pistol Won'))
-            t, w = parsear_tupla_vitorias(r.get('Eco (won)'))
-            total['eco_total'] += t; total['eco_wins'] += w
-            t, w = parsear_tupla_vitorias(r.get('Semi-eco (won)'))
-            total['semi_eco_total'] += t; total['semi_eco_wins'] += w
-            t, w = parsear_tupla_vitorias(r.get('Semi-buy (won)'))
-            total['semi_buy_total'] += t; total['semi_buy_wins'] += w
-            t, w = parsear_tupla_vitorias(r.get('Full buy(won)'))
-            total['full_buy_total'] += t; total['full_buy_wins'] += w
-        return total
-
-    def ratio(wins: int, total: int) -> float:
-        return (wins / total * 100.0) if total > 0 else 0.0
-
-    a = acumular(team_a_abbr)
-    b = acumular(team_b_abbr)
+    a = totais_economia(team_a_abbr, mapa, dataset)
+    b = totais_economia(team_b_abbr, mapa, dataset)
+
+    ratio = taxa_vitoria
 
     headers = ["Métrica", time_a, time_b]
     rows = [
@@ -277,106 +2056,137 @@ def comparar_economia_times():
         ["Semi-buy win%", f"{ratio(a['semi_buy_wins'], a['semi_buy_total']):.1f}%", f"{ratio(b['semi_buy_wins'], b['semi_buy_total']):.1f}%"],
         ["Full-buy win%", f"{ratio(a['full_buy_wins'], a['full_buy_total']):.1f}%", f"{ratio(b['full_buy_wins'], b['full_buy_total']):.1f}%"],
     ]
-    fazer_tabela(headers, rows)
-
-
-def jogadores_adaptativos():
-    players = carregar_stats_jogadores()
-    fk_list = []
-    cl_list = []
-    for p in players:
-        fk_list.append(parsear_int(p.get('first_kills')))
-        cl_list.append(parsear_porcentagem(p.get('cl_percent')))
-
-    if not players:
-        print("Sem dados de jogadores")
-        return
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
+
+
+METRICAS_ECONOMIA = ['pistol', 'eco', 'semi_eco', 'semi_buy', 'full_buy']
+
+
+@instrumentado('relatorio')
+def matriz_economia(metrica='full_buy', mapa=None, dataset=None, mostrar=True):
+    r = Resultado()
+    if metrica not in METRICAS_ECONOMIA:
+        r.texto(f"Métrica '{metrica}' inválida. Opções: {', '.join(METRICAS_ECONOMIA)}")
+        return r.emitir(mostrar)
+    confrontos = confrontos_economia(dataset)
+    if mapa:
+        mapa = mapa.strip()
+        celulas = confrontos['por_confronto_mapa'].get(mapa, {})
+    else:
+        celulas = confrontos['por_confronto']
+    if not celulas:
+        r.texto("Nenhum confronto encontrado.")
+        return r.emitir(mostrar)
+
+    times = sorted({a for a, _ in celulas} | {b for _, b in celulas})
+    headers = ["Time \\ Adversário"] + times
+    rows = []
+    for a in times:
+        linha = [a]
+        for b in times:
+            total = celulas.get((a, b))
+            if total is None:
+                linha.append("-")
+            elif metrica == 'pistol':
+                linha.append(total['pistol_won'])
+            else:
+                linha.append(f"{taxa_vitoria(total[metrica + '_wins'], total[metrica + '_total']):.1f}%")
+        rows.append(linha)
+    titulo = f"Matriz de economia: {metrica}" + (f" em {mapa}" if mapa else "")
+    r.texto(titulo)
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
+
+
+@instrumentado('relatorio')
+def jogadores_adaptativos(dataset=None, mostrar=True):
+    r = Resultado()
+    ds = dataset or DATASET
+    colunas = ['player_name', 'team', 'first_kills', 'cl_percent']
+
+    # 1ª passada: só a contagem de cada valor, suficiente para os quartis
+    contagem_fk, contagem_cl = Counter(), Counter()
+    for jogadores in ds.blocos('player_stats.csv', colunas):
+        contagem_fk.update(jogadores['first_kills'])
+        contagem_cl.update(jogadores['cl_percent'])
+
+    if not contagem_fk:
+        r.texto("Sem dados de jogadores")
+        return r.emitir(mostrar)
 
     try:
-        q_fk = quantiles(fk_list, n=4)[2]
-        q_cl = quantiles(cl_list, n=4)[2]
+        q_fk = quantis_contagem(contagem_fk, n=4)[2]
+        q_cl = quantis_contagem(contagem_cl, n=4)[2]
     except Exception:
-        q_fk = median(fk_list)
-        q_cl = median(cl_list)
+        from statistics import median
+        q_fk = median(contagem_fk.elements())
+        q_cl = median(contagem_cl.elements())
 
-    altos_fk = {p.get('player_name') for p in players if parsear_int(p.get('first_kills')) >= q_fk}
-    altos_cl = {p.get('player_name') for p in players if parsear_porcentagem(p.get('cl_percent')) >= q_cl}
-    intersec = [p for p in players if p.get('player_name') in altos_fk and p.get('player_name') in altos_cl]
+    # 2ª passada: quem passa do quartil em cada métrica
+    altos_fk, altos_cl = set(), set()
+    for jogadores in ds.blocos('player_stats.csv', colunas):
+        nomes = jogadores['player_name']
+        altos_fk.update(nome for nome, alto in zip(nomes, mascara_minimo(jogadores['first_kills'], q_fk)) if alto)
+        altos_cl.update(nome for nome, alto in zip(nomes, mascara_minimo(jogadores['cl_percent'], q_cl)) if alto)
 
     headers = ["Jogador", "Time", "First Kills", "Clutch%"]
     rows = []
-    for p in intersec:
-        rows.append([
-            p.get('player_name','?'),
-            p.get('team','?'),
-            parsear_int(p.get('first_kills')),
-            f"{parsear_porcentagem(p.get('cl_percent')):.0f}%",
-        ])
-    fazer_tabela(headers, rows)
-
-
-def analisar_winrate_pick():
-    time_escolhido = input("Time: ").strip()
+    for jogadores in ds.blocos('player_stats.csv', colunas):
+        fk_list, cl_list = jogadores['first_kills'], jogadores['cl_percent']
+        for i, nome in enumerate(jogadores['player_name']):
+            if nome in altos_fk and nome in altos_cl:
+                rows.append([
+                    nome,
+                    jogadores['team'][i],
+                    fk_list[i],
+                    f"{cl_list[i]:.0f}%",
+                ])
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
+
+
+def cenarios_pick(chave: str, dataset=None):
+    # {cenário: {'wins', 'total', 'detalhes'}} de um time, ou None se ele não jogou
+    ds = dataset or DATASET
+    if ds.sqlite:
+        return cenarios_pick_sqlite(chave, ds)
+    resumo = resumo_partidas(ds)
+    contagem = resumo['por_time'].get(chave)
+    if contagem is None:
+        return None
+    mapas = ds.tabela('detailed_matches_maps.csv')
+    cenarios = {}
+    for cenario in CENARIOS_PICK:
+        detalhes = []
+        for i in contagem[cenario]['mapas']:
+            t1, t2 = resumo['times_por_partida'][mapas['match_id'][i]]
+            detalhes.append({
+                'map': mapas['map_name'][i],
+                'opponent': t2 if chave_time(t1) == chave else t1,
+                'score': mapas['score'][i],
+                'result': "V" if chave_time(mapas['winner'][i]) == chave else "D",
+                'picked_by': mapas['picked_by'][i].strip(),
+            })
+        cenarios[cenario] = {'wins': contagem[cenario]['wins'], 'total': contagem[cenario]['total'], 'detalhes': detalhes}
+    return cenarios
+
+
+@instrumentado('relatorio')
+def analisar_winrate_pick(time=None, dataset=None, mostrar=True):
+    r = Resultado()
+    time_escolhido = (input("Time: ") if time is None else time).strip()
     time = (time_escolhido or '').strip()
     time = get_team_abbr(time) #vsfffffffffff
     if not time:
-        print("Equipe invalida.")
-        return
-    
-    overview = ler_csv_dicts('detailed_matches_overview.csv')
-    team_matches = {}
-    for match in overview:
-        if time in match['teams']:
-            teams = match['teams'].split(' vs ')
-            opponent = teams[1] if teams[0] == time else teams[0]
-            team_matches[match['match_id']] = {
-                'opponent': opponent,
-                'score': match['score'],
-                'date': match['date']
-            }
-    
-    if not team_matches:
-        print(f"Time '{time}' não encontrado nos dados.")
-        return
+        r.texto("Equipe invalida.")
+        return r.emitir(mostrar)
     
-    rows = carregar_partidas_detalhadas()
-    contagem = {
-        'proprio_pick': {'wins': 0, 'total': 0, 'details': []},
-        'pick_adversario': {'wins': 0, 'total': 0, 'details': []},
-        'decider': {'wins': 0, 'total': 0, 'details': []},
-    }
-
-    for r in rows:
-        match_id = r.get('match_id')
-        if match_id not in team_matches:
-            continue
-            
-        picked_by = str(r.get('picked_by','')).strip()
-        winner = str(r.get('winner','')).strip()
-        map_name = r.get('map_name', '')
-        score = r.get('score', '')
-        
-        if picked_by.lower() == 'decider':
-            cat = 'decider'
-        elif picked_by.lower() == time.lower():
-            cat = 'proprio_pick'
-        else:
-            cat = 'pick_adversario'
-
-        contagem[cat]['total'] += 1
-        won = winner.lower() == time.lower()
-        if won:
-            contagem[cat]['wins'] += 1
-        
-        match_info = team_matches[match_id]
-        result = "V" if won else "D"
-        contagem[cat]['details'].append({
-            'map': map_name,
-            'opponent': match_info['opponent'],
-            'score': score,
-            'result': result,
-            'picked_by': picked_by
-        })
+    chave = time.upper()
+    contagem = cenarios_pick(chave, dataset)
+    if contagem is None:
+        r.texto(f"Time '{time}' não encontrado nos dados.")
+        return r.emitir(mostrar)
 
     def rate(c):
         return (contagem[c]['wins'] / contagem[c]['total'] * 100.0) if contagem[c]['total'] > 0 else 0.0
@@ -388,22 +2198,22 @@ def analisar_winrate_pick():
         'decider': 'Decider',
     }
     rows = []
-    for key in ['proprio_pick', 'pick_adversario', 'decider']:
+    for key in CENARIOS_PICK:
         rows.append([
             label_map[key],
             contagem[key]['wins'],
             contagem[key]['total'],
             f"{rate(key):.1f}%",
         ])
-    fazer_tabela(headers, rows)
+    r.tabela(headers, rows)
     
-    print(f"\n=== DETALHES DOS MAPAS PARA {time} ===")
-    for key in ['proprio_pick', 'pick_adversario', 'decider']:
+    r.texto(f"\n=== DETALHES DOS MAPAS PARA {time} ===")
+    for key in CENARIOS_PICK:
         if contagem[key]['total'] > 0:
-            print(f"\n{label_map[key]} ({contagem[key]['wins']}/{contagem[key]['total']} - {rate(key):.1f}%):")
+            r.texto(f"\n{label_map[key]} ({contagem[key]['wins']}/{contagem[key]['total']} - {rate(key):.1f}%):")
             details_headers = ["Mapa", "Adversário", "Score", "Resultado", "Pick"]
             details_rows = []
-            for detail in contagem[key]['details']:
+            for detail in contagem[key]['detalhes']:
                 details_rows.append([
                     detail['map'],
                     detail['opponent'],
@@ -411,123 +2221,250 @@ def analisar_winrate_pick():
                     detail['result'],
                     detail['picked_by']
                 ])
-            fazer_tabela(details_headers, details_rows)
-
-
-def ranking_final_times():
-    official_ranking = [
-        {"pos": "1º Lugar", "team": "NRG", "stage": "Vencedor da Grande Final"},
-        {"pos": "2º Lugar", "team": "FNATIC", "stage": "Perdeu a Grande Final para NRG (3-2)"},
-        {"pos": "3º Lugar", "team": "DRX", "stage": "Perdeu a Final Inferior (Lower Final) para FNATIC (3-1)"},
-        {"pos": "4º Lugar", "team": "Paper Rex", "stage": "Eliminado na Rodada 3 Inferior (Lower Round 3) por DRX (2-0)"},
-        {"pos": "5º-6º Lugares", "team": "MIBR", "stage": "Eliminado na Rodada 2 Inferior (Lower Round 2) por DRX (2-1)"},
-        {"pos": "", "team": "Team Heretics", "stage": "Eliminado na Rodada 2 Inferior (Lower Round 2) por Paper Rex (2-1)"},
-        {"pos": "7º-8º Lugares", "team": "G2 Esports", "stage": "Eliminado na Rodada 1 Inferior (Lower Round 1) por DRX (2-1)"},
-        {"pos": "", "team": "GIANTX", "stage": "Eliminado na Rodada 1 Inferior (Lower Round 1) por Team Heretics (2-1)"},
-        {"pos": "9º-12º Lugares", "team": "Team Liquid", "stage": "Eliminado na Fase de Grupos (Decider C) por DRX (2-0)"},
-        {"pos": "", "team": "Xi Lai Gaming", "stage": "Eliminado na Fase de Grupos (Decider A) por GIANTX (2-0)"},
-        {"pos": "", "team": "T1", "stage": "Eliminado na Fase de Grupos (Decider D) por G2 Esports (2-0)"},
-        {"pos": "", "team": "Rex Regum Qeon", "stage": "Eliminado na Fase de Grupos (Decider B) por MIBR (2-0)"},
-        {"pos": "13º-16º Lugares", "team": "Sentinels", "stage": "Eliminado na Fase de Grupos (Elimination A) por Xi Lai Gaming (2-1)"},
-        {"pos": "", "team": "EDward Gaming", "stage": "Eliminado na Fase de Grupos (Elimination C) por Team Liquid (2-1)"},
-        {"pos": "", "team": "Bilibili Gaming", "stage": "Eliminado na Fase de Grupos (Elimination B) por Rex Regum Qeon (2-1)"},
-        {"pos": "", "team": "Dragon Ranger Gaming", "stage": "Eliminado na Fase de Grupos (Elimination D) por G2 Esports (2-0)"},
+            r.tabela(details_headers, details_rows)
+    return r.emitir(mostrar)
+
+
+@instrumentado('relatorio')
+def analisar_vetos(time=None, dataset=None, mostrar=True):
+    r = Resultado()
+    vetos = analise_vetos(dataset)
+
+    def pct(wins, total):
+        return f"{taxa_vitoria(wins, total):.1f}%" if total else "-"
+
+    def mais_comum(contagem):
+        if not contagem:
+            return "-"
+        mapa = max(sorted(contagem), key=lambda m: contagem[m])
+        return f"{mapa} ({contagem[mapa]})"
+
+    if vetos['ignorados']:
+        mid, parte = vetos['ignorados'][0]
+        r.texto(f"Aviso: {len(vetos['ignorados'])} trecho(s) de pick_ban_info não reconhecido(s) e fora da contagem "
+                f"(ex.: partida {mid}: '{parte}').")
+
+    if time:
+        chave = chave_time(time)
+        dados = vetos['por_time'].get(chave)
+        if dados is None:
+            r.texto(f"Time '{time}' não encontrado nos vetos.")
+            return r.emitir(mostrar)
+        headers = ["Mapa", "1º ban", "Bans", "Picks", "Picks jogados", "Vitórias no pick", "Conversão"]
+        rows = []
+        mapas = sorted(set(dados['bans']) | set(dados['picks']))
+        for mapa in mapas:
+            pick = dados['picks'].get(mapa, {'total': 0, 'jogados': 0, 'wins': 0})
+            rows.append([
+                mapa,
+                dados['primeiro_ban'].get(mapa, 0),
+                dados['bans'].get(mapa, 0),
+                pick['total'],
+                pick['jogados'],
+                pick['wins'],
+                pct(pick['wins'], pick['jogados']),
+            ])
+        r.texto(f"=== VETOS DE {chave} ({dados['series']} séries) ===")
+        r.tabela(headers, rows)
+        decider = dados['decider']
+        r.texto(f"Decider: {decider['wins']}/{decider['total']} ({pct(decider['wins'], decider['total'])})")
+        return r.emitir(mostrar)
+
+    headers = ["Time", "Séries", "1º ban mais comum", "Mais pickado", "Picks jogados", "Conversão de pick", "Decider"]
+    rows = []
+    for chave in sorted(vetos['por_time']):
+        dados = vetos['por_time'][chave]
+        jogados = sum(p['jogados'] for p in dados['picks'].values())
+        wins = sum(p['wins'] for p in dados['picks'].values())
+        decider = dados['decider']
+        rows.append([
+            chave,
+            dados['series'],
+            mais_comum(dados['primeiro_ban']),
+            mais_comum({m: p['total'] for m, p in dados['picks'].items()}),
+            jogados,
+            pct(wins, jogados),
+            f"{decider['wins']}/{decider['total']} ({pct(decider['wins'], decider['total'])})",
+        ])
+    r.tabela(headers, rows)
+
+    series = len([e for e in vetos['eventos_por_partida'].values() if e])
+    headers = ["Mapa", "Bans", "Picks", "Restou (decider)", "% das séries", "Decider jogado"]
+    rows = []
+    for mapa in sorted(vetos['por_mapa']):
+        dados = vetos['por_mapa'][mapa]
+        rows.append([
+            mapa,
+            dados['bans'],
+            dados['picks'],
+            dados['restante'],
+            pct(dados['restante'], series),
+            dados['restante_jogado'],
+        ])
+    r.texto("")
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
+
+
+@instrumentado('relatorio')
+def desempenho_por_mapa(agrupamento='jogador-mapa', filtro=None, minimo=1, dataset=None, mostrar=True):
+    r = Resultado()
+    if agrupamento not in AGRUPAMENTOS_MAPAS:
+        r.texto(f"Agrupamento '{agrupamento}' inválido. Opções: {', '.join(AGRUPAMENTOS_MAPAS)}")
+        return r.emitir(mostrar)
+    ds = dataset or DATASET
+    grupos = estatisticas_mapas(ds)[agrupamento]
+
+    por_time = agrupamento.startswith('time')
+    alvo = None
+    if filtro:
+        alvo = chave_time(filtro) if por_time else filtro.strip().casefold()
+    chaves = [
+        chave for chave, total in grupos.items()
+        if total['n'] >= (minimo or 1)
+        and (alvo is None or (chave[0] if por_time else chave[0].casefold()) == alvo)
     ]
-    
-    overview = ler_csv_dicts('detailed_matches_overview.csv')
-    maps_rows = carregar_partidas_detalhadas()
-    player_rows = carregar_stats_jogadores()
-    
-    team_stats = {}
-    for entry in official_ranking:
-        team = entry['team']
-        team_stats[team] = {
-            'series_wins': 0,
-            'series_losses': 0,
-            'maps_wins': 0,
-            'maps_losses': 0,
-            'rating': 0.0,
-            'acs': 0.0,
-            'kast': 0.0,
-            'player_count': 0
-        }
-    
-    for m in overview:
-        mid = m['match_id']
-        t1, t2 = [t.strip() for t in m['teams'].split(' vs ')]
-        if t1 in team_stats and t2 in team_stats:
-            w_counts = {t1: 0, t2: 0}
-            for r in maps_rows:
-                if r['match_id'] == mid:
-                    w_counts[r['winner']] = w_counts.get(r['winner'], 0) + 1
-            if w_counts[t1] > w_counts[t2]:
-                team_stats[t1]['series_wins'] += 1
-                team_stats[t2]['series_losses'] += 1
-            else:
-                team_stats[t2]['series_wins'] += 1
-                team_stats[t1]['series_losses'] += 1
-    
-    for r in maps_rows:
-        winner = r['winner']
-        if winner in team_stats:
-            team_stats[winner]['maps_wins'] += 1
-        for m in overview:
-            if m['match_id'] == r['match_id']:
-                t1, t2 = [t.strip() for t in m['teams'].split(' vs ')]
-                loser = t2 if winner == t1 else t1
-            if loser in team_stats:
-                team_stats[loser]['maps_losses'] += 1
-            break
-    
-    
-    for p in player_rows:
-        team_abbr = p.get('team')
-        team_full_name = None
-        for full_name, abbr in TEAM_ABBREVIATIONS.items():
-            if abbr == team_abbr:
-                team_full_name = full_name
-                break
-        
-        if team_full_name and team_full_name in team_stats:
-            team_stats[team_full_name]['rating'] += parsear_float(p.get('rating'))
-            team_stats[team_full_name]['acs'] += parsear_float(p.get('acs'))
-            team_stats[team_full_name]['kast'] += parsear_porcentagem(p.get('kast'))
-            team_stats[team_full_name]['player_count'] += 1
-    
-    for team in team_stats:
-        if team_stats[team]['player_count'] > 0:
-            team_stats[team]['rating'] /= team_stats[team]['player_count']
-            team_stats[team]['acs'] /= team_stats[team]['player_count']
-            team_stats[team]['kast'] /= team_stats[team]['player_count']
+    if not chaves:
+        r.texto(f"Nenhum dado para '{filtro.strip()}'." if filtro else "Sem dados de mapas por jogador.")
+        return r.emitir(mostrar)
+
+    def percentis(total):
+        if total['n'] < 2:
+            return list(total['ratings']) * 3
+        return quantis_contagem(total['ratings'], n=4)
+
+    primeiro, segundo = agrupamento.split('-')
+    headers = [primeiro.capitalize(), segundo.capitalize(), "Mapas", "Win%", "Rating", "P25", "Mediana", "P75",
+               "ACS", "K/D/A", "KAST", "ADR", "HS%", "FK-FD"]
+    rows = []
+    for chave in sorted(chaves, key=lambda c: (c[0].casefold(), -grupos[c]['n'], c[1])):
+        total = grupos[chave]
+        n = total['n']
+        p25, p50, p75 = percentis(total)
+        rows.append([
+            chave[0],
+            chave[1],
+            n,
+            f"{taxa_vitoria(total['wins'], n):.1f}%",
+            f"{total['rating'] / n:.2f}",
+            f"{p25:.2f}",
+            f"{p50:.2f}",
+            f"{p75:.2f}",
+            f"{total['acs'] / n:.1f}",
+            f"{total['k'] / n:.1f}/{total['d'] / n:.1f}/{total['a'] / n:.1f}",
+            f"{total['kast'] / n:.0f}%",
+            f"{total['adr'] / n:.1f}",
+            f"{total['hs_percent'] / n:.0f}%",
+            f"{total['fk']}-{total['fd']}",
+        ])
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
+
+
+MULTIKILLS = ['2K', '3K', '4K', '5K']
+CLUTCHES = ['1v1', '1v2', '1v3', '1v4', '1v5']
+
+# critério -> valor por mapa de um grupo de agregados_performance
+CRITERIOS_PERFORMANCE = {
+    'multikills': lambda t: sum(t[c] for c in MULTIKILLS) / t['n'],
+    'clutches': lambda t: sum(t[c] for c in CLUTCHES) / t['n'],
+    'econ': lambda t: t['ECON'] / t['n'],
+}
+
+
+@instrumentado('relatorio')
+def analisar_multikills(grupo='jogador', ordenar='multikills', quartil=None, minimo=1, limite=None,
+                        dataset=None, mostrar=True):
+    r = Resultado()
+    agrupamento = 'por_' + grupo
+    if agrupamento not in CHAVES_PERFORMANCE or ordenar not in CRITERIOS_PERFORMANCE:
+        r.texto(f"Use grupo em {', '.join(g[4:] for g in CHAVES_PERFORMANCE)} "
+                f"e ordenação em {', '.join(CRITERIOS_PERFORMANCE)}.")
+        return r.emitir(mostrar)
+    grupos = agregados_performance(dataset)[agrupamento]
+    chaves = sorted(grupos)
+    totais = [grupos[k] for k in chaves]
+    if not totais:
+        r.texto("Sem dados de performance")
+        return r.emitir(mostrar)
+
+    # uma coluna por critério, alinhada com `chaves`; os filtros são máscaras
+    colunas = {nome: [valor(t) for t in totais] for nome, valor in CRITERIOS_PERFORMANCE.items()}
+    elegiveis = mascara_minimo([t['n'] for t in totais], minimo or 1)
+    criterios = {'ambos': ['multikills', 'clutches']}.get(quartil, [quartil] if quartil else [])
+    mascaras = [elegiveis]
+    if any(elegiveis):
+        # cada quartil é calculado sobre os mesmos elegíveis e só depois se cruzam
+        mascaras += [mascara_minimo(colunas[nome], limite_quartil(colunas[nome], elegiveis)) for nome in criterios]
+    mascara = combinar_mascaras(*mascaras)
+
+    indices = top_k(limite or len(chaves), colunas[ordenar], mascara=mascara)
+    if not indices:
+        r.texto("Nenhum grupo passou nos filtros.")
+        return r.emitir(mostrar)
+
+    headers = [grupo.capitalize(), "Mapas"] + MULTIKILLS + ["Multi/mapa"] + CLUTCHES + ["Clutch/mapa", "ECON", "PL", "DE"]
+    rows = []
+    for i in indices:
+        t = totais[i]
+        rows.append(
+            [chaves[i], t['n']]
+            + [t[c] for c in MULTIKILLS]
+            + [f"{colunas['multikills'][i]:.2f}"]
+            + [t[c] for c in CLUTCHES]
+            + [f"{colunas['clutches'][i]:.2f}", f"{colunas['econ'][i]:.1f}", t['PL'], t['DE']]
+        )
+    if criterios:
+        r.texto(f"Acima do 3º quartil em: {' e '.join(criterios)}")
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
+
+
+@instrumentado('relatorio')
+def ranking_final_times(derrotas=DERROTAS_ELIMINACAO, final=FASE_FINAL, dataset=None, mostrar=True):
+    r = Resultado()
+    ds = dataset or DATASET
+    classificacao = classificacao_evento(ds)
+    if ds.sqlite:
+        medias = medias_times_sqlite(ds)
+    else:
+        medias = medias_em_blocos(ds, 'player_stats.csv', 'team', ['rating', 'acs', 'kast'])
+    # player_stats.csv usa abreviações; matches.csv, o nome completo
+    medias = {ABBR_PARA_NOME.get(abbr, abbr): media for abbr, media in medias.items()}
     
     headers = ["Posição", "Time", "Estágio de Eliminação", "Séries (W-L)", "Mapas (W-L)", "Rating médio", "ACS médio", "KAST médio"]
     rows = []
     
-    for entry in official_ranking:
+    for entry in posicoes_finais(classificacao, derrotas, final):
         team = entry['team']
-        stats = team_stats.get(team, {})
+        stats = classificacao['times'][team]
+        media = medias.get(team, {})
         rows.append([
             entry['pos'],
             team,
             entry['stage'],
-            f"{stats.get('series_wins', 0)}-{stats.get('series_losses', 0)}",
-            f"{stats.get('maps_wins', 0)}-{stats.get('maps_losses', 0)}",
-            f"{stats.get('rating', 0):.2f}",
-            f"{stats.get('acs', 0):.1f}",
-            f"{stats.get('kast', 0):.0f}%",
+            f"{stats['series_wins']}-{stats['series_losses']}",
+            f"{stats['maps_wins']}-{stats['maps_losses']}",
+            f"{media.get('rating', 0):.2f}",
+            f"{media.get('acs', 0):.1f}",
+            f"{media.get('kast', 0):.0f}%",
         ])
     
-    fazer_tabela(headers, rows)
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
 
 
-def listar_times_debug():
+@instrumentado('relatorio')
+def listar_times_debug(mostrar=True):
+    r = Resultado()
     headers = ["Nome Completo", "Abreviação"]
     rows = []
     for full_name, abbr in TEAM_ABBREVIATIONS.items():
         rows.append([full_name, abbr])
     
-    print("=== TIMES DISPONÍVEIS ===")
-    fazer_tabela(headers, rows)
+    r.texto("=== TIMES DISPONÍVEIS ===")
+    r.tabela(headers, rows)
+    return r.emitir(mostrar)
 
 
 def menu_debug():
@@ -562,24 +2499,28 @@ def menu():
     print("-=-=-"*20)
 
 
-def principal():
+# opção do menu -> (relatório, perguntas feitas antes de consultar)
+OPCOES_MENU = {
+    '1': ('top10', []),
+    '2': ('especialistas', [('agente', "Agente: ")]),
+    '3': ('pickrate', [('mapa', "Mapa: ")]),
+    '4': ('economia', [('time_a', "Time A: "), ('time_b', "Time B: ")]),
+    '5': ('adaptativos', []),
+    '6': ('winrate', [('time', "Time: ")]),
+    '7': ('ranking', []),
+}
+
+
+def principal(dataset=None, formato: str = 'texto'):
+    # `dataset` e `formato` vêm das opções globais da linha de comando
+    ds = dataset or DATASET
     while True:
         menu()
         op = input("Escolha uma opção: ").strip().lower()
-        if op == '1':
-            listar_top10_performance()
-        elif op == '2':
-            top_5_especialistas()
-        elif op == '3':
-            pickrate_por_mapa()
-        elif op == '4':
-            comparar_economia_times()
-        elif op == '5':
-            jogadores_adaptativos()
-        elif op == '6':
-            analisar_winrate_pick()
-        elif op == '7':
-            ranking_final_times()
+        if op in OPCOES_MENU:
+            relatorio, perguntas = OPCOES_MENU[op]
+            kwargs = {nome: input(pergunta) for nome, pergunta in perguntas}
+            consultar(relatorio, ds, **kwargs).mostrar(formato)
         elif op == '8':
             menu_debug()
         elif op == '9':
@@ -589,5 +2530,300 @@ def principal():
         input("\nPressione Enter para continuar...\n")
 
 
+# subcomando -> (função, argumentos que ela recebe)
+RELATORIOS = {
+    'top10': (listar_top10_performance, []),
+    'especialistas': (top_5_especialistas, ['agente']),
+    'pickrate': (pickrate_por_mapa, ['mapa']),
+    'economia': (comparar_economia_times, ['time_a', 'time_b', 'mapa']),
+    'matriz-economia': (matriz_economia, ['metrica', 'mapa']),
+    'adaptativos': (jogadores_adaptativos, []),
+    'winrate': (analisar_winrate_pick, ['time']),
+    'vetos': (analisar_vetos, ['time']),
+    'mapas': (desempenho_por_mapa, ['agrupamento', 'filtro', 'minimo']),
+    'multikills': (analisar_multikills, ['grupo', 'ordenar', 'quartil', 'minimo', 'limite']),
+    'ranking': (ranking_final_times, ['derrotas', 'final']),
+    'times': (listar_times_debug, []),
+}
+
+# funções que não leem CSVs não recebem dataset
+SEM_DATASET = {'times'}
+
+
+def criar_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Relatórios do Valorant Champions 2025.")
+    parser.add_argument('--json', action='store_true', help="imprime o resultado em JSON")
+    parser.add_argument('--dados', help="diretório com os CSVs (padrão: ao lado do script ou ./data)")
+    parser.add_argument('--cache', help="diretório do cache binário de colunas")
+    parser.add_argument('--formato', choices=FORMATOS_TABELA, default='texto', help="formato das tabelas")
+    parser.add_argument('--lote', help="arquivo com uma consulta por linha, executadas sobre o mesmo Dataset")
+    parser.add_argument('--processos', type=int, default=1, help="distribui as consultas entre N processos")
+    parser.add_argument('--sqlite', help="usa (e mantém em dia) este banco SQLite nos relatórios com versão SQL")
+    parser.add_argument('--cache-resultados', type=int, default=128,
+                        help="quantos resultados de relatórios manter em memória (0 desliga)")
+    parser.add_argument('--instrumentar', action='store_true', default=flag_do_ambiente('CHAMPIONS_INSTRUMENTAR'),
+                        help="mostra tempos, chamadas, linhas e bytes por etapa no stderr (ou CHAMPIONS_INSTRUMENTAR=1)")
+    parser.add_argument('--perfil', default=os.environ.get('CHAMPIONS_PERFIL'),
+                        help="grava a saída do cProfile neste arquivo, para abrir com pstats (ou CHAMPIONS_PERFIL)")
+    parser.add_argument('--bloco', type=int, help="lê os CSVs em blocos de N linhas nos relatórios agregados (memória constante)")
+    # permite "top10 --json" além de "--json top10" (idem para --formato)
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument('--json', action='store_true', default=argparse.SUPPRESS, help="imprime o resultado em JSON")
+    comum.add_argument('--formato', choices=FORMATOS_TABELA, default=argparse.SUPPRESS, help="formato das tabelas")
+    sub = parser.add_subparsers(dest='relatorio')
+    sub.add_parser('top10', parents=[comum], help="top 10 jogadores por performance geral")
+    sub.add_parser('especialistas', parents=[comum], help="top 5 especialistas por agente").add_argument('--agente', required=True)
+    sub.add_parser('pickrate', parents=[comum], help="pickrate de agentes por mapa").add_argument('--mapa', required=True)
+    p = sub.add_parser('economia', parents=[comum], help="comparar economia de dois times")
+    p.add_argument('--time-a', required=True)
+    p.add_argument('--time-b', required=True)
+    p.add_argument('--mapa', help="restringe a comparação a um mapa")
+    p = sub.add_parser('matriz-economia', parents=[comum], help="matriz de confrontos diretos de economia entre todos os times")
+    p.add_argument('--metrica', choices=METRICAS_ECONOMIA, default='full_buy')
+    p.add_argument('--mapa', help="restringe a matriz a um mapa")
+    sub.add_parser('adaptativos', parents=[comum], help="intersecção de players FK e Clutch%%")
+    sub.add_parser('winrate', parents=[comum], help="winrate em picks e deciders de um time").add_argument('--time', required=True)
+    sub.add_parser('vetos', parents=[comum], help="análise de picks e bans (pick_ban_info)").add_argument(
+        '--time', help="detalha um time; sem ele mostra a liga toda")
+    p = sub.add_parser('mapas', parents=[comum], help="desempenho por jogador×mapa, jogador×agente ou time×mapa")
+    p.add_argument('--agrupamento', choices=AGRUPAMENTOS_MAPAS, default='jogador-mapa')
+    p.add_argument('--filtro', help="jogador (ou time, em time-mapa) a detalhar")
+    p.add_argument('--minimo', type=int, default=1, help="mínimo de mapas jogados por grupo")
+    p = sub.add_parser('multikills', parents=[comum], help="multi-kills e clutches (performance_data.csv)")
+    p.add_argument('--grupo', choices=[g[4:] for g in CHAVES_PERFORMANCE], default='jogador')
+    p.add_argument('--ordenar', choices=CRITERIOS_PERFORMANCE, default='multikills')
+    p.add_argument('--quartil', choices=['multikills', 'clutches', 'ambos'],
+                   help="só grupos acima do 3º quartil no critério (ambos = intersecção)")
+    p.add_argument('--minimo', type=int, default=1, help="mínimo de mapas jogados por grupo")
+    p.add_argument('--limite', type=int, help="mostra só os N primeiros")
+    p = sub.add_parser('ranking', parents=[comum], help="ranking final de times (a partir de matches.csv)")
+    p.add_argument('--eventos', nargs='+', metavar='DIR', help="gera o ranking de cada diretório de evento, em lote")
+    p.add_argument('--derrotas', type=int, default=DERROTAS_ELIMINACAO,
+                   help="derrotas num estágio que eliminam um time (1 = eliminação simples)")
+    p.add_argument('--final', default=FASE_FINAL, help="rodada (coluna week) que decide o campeão")
+    sub.add_parser('times', parents=[comum], help="lista os times conhecidos")
+    sub.add_parser('todos', parents=[comum], help="roda um relatório para todos os times, pares ou agentes").add_argument(
+        '--tipo', choices=['winrate', 'economia', 'especialistas', 'tudo'], default='tudo')
+    return parser
+
+
+# argumento -> forma canônica; consultas equivalentes caem na mesma entrada do cache
+NORMALIZAR_ARGUMENTOS = {
+    'time': chave_time,
+    'time_a': chave_time,
+    'time_b': chave_time,
+    'agente': lambda v: v.strip().casefold(),
+    'mapa': str.strip,
+    'filtro': str.strip,
+}
+
+# argumentos que o relatório mostra como foram digitados (cabeçalhos, "não
+# encontrado"): entram na chave também sem normalizar
+ARGUMENTOS_EXIBIDOS = {
+    'especialistas': ['agente'],
+    'economia': ['time_a', 'time_b'],
+    'winrate': ['time'],
+    'vetos': ['time'],
+    'mapas': ['filtro'],
+}
+
+
+def normalizar_argumentos(kwargs: dict) -> dict:
+    normalizados = {}
+    for nome, valor in kwargs.items():
+        normalizar = NORMALIZAR_ARGUMENTOS.get(nome)
+        normalizados[nome] = normalizar(valor) if normalizar and isinstance(valor, str) else valor
+    return normalizados
+
+
+def executar_consulta(relatorio: str, kwargs: dict, dataset) -> Resultado:
+    funcao, _ = RELATORIOS[relatorio]
+    kwargs = dict(kwargs)
+    evento = kwargs.pop('evento', None)
+    if evento:
+        dataset = dataset.evento(evento)
+    if relatorio in SEM_DATASET:
+        return funcao(mostrar=False, **kwargs)
+    # o relatório recebe os argumentos originais
+    exibidos = tuple((nome, kwargs.get(nome)) for nome in ARGUMENTOS_EXIBIDOS.get(relatorio, []))
+    chave = (relatorio, tuple(sorted(normalizar_argumentos(kwargs).items())), exibidos)
+    return dataset.memorizar(chave, lambda: funcao(mostrar=False, dataset=dataset, **kwargs))
+
+
+def consultar(relatorio: str, dataset=None, **kwargs) -> Resultado:
+    # entrada para quem usa o módulo como biblioteca: mesmo cache de resultados
+    # da linha de comando, ex. consultar('winrate', time='NRG').para_dict()
+    return executar_consulta(relatorio, kwargs, dataset or DATASET)
+
+
+def consulta_de_args(args):
+    _, nomes = RELATORIOS[args.relatorio]
+    return args.relatorio, {nome: getattr(args, nome) for nome in nomes}
+
+
+def consultas_de_args(texto: str, args) -> list:
+    # "ranking --eventos A B" vira uma consulta por diretório de evento
+    relatorio, kwargs = consulta_de_args(args)
+    eventos = getattr(args, 'eventos', None)
+    if not eventos:
+        return [(texto, relatorio, kwargs)]
+    return [(f"{relatorio} --eventos {evento}", relatorio, dict(kwargs, evento=evento)) for evento in eventos]
+
+
+def ler_lote(parser, path: str):
+    import shlex
+
+    consultas = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha or linha.startswith('#'):
+                continue
+            consultas.extend(consultas_de_args(linha, parser.parse_args(shlex.split(linha))))
+    return consultas
+
+
+def aquecer(dataset):
+    # Carrega tabelas e estruturas derivadas antes do fork para que os
+    # processos filhos herdem tudo pronto em vez de refazer o trabalho.
+    for file_name in ESQUEMAS:
+        # em modo de blocos as tabelas grandes não devem ficar em memória
+        if not dataset.bloco and os.path.exists(dataset.caminho(file_name)):
+            dataset.tabela(file_name)
+    if dataset.sqlite:
+        # importa tudo antes do fork para os filhos só lerem o banco
+        dataset.banco(*[f for f in ESQUEMAS if os.path.exists(dataset.caminho(f))])
+    indices_partidas(dataset)
+    indice_agentes(dataset)
+    resumo_partidas(dataset)
+    classificacao_evento(dataset)
+    analise_vetos(dataset)
+    estatisticas_mapas(dataset)
+    agregados_performance(dataset)
+    agregados_economia(dataset)
+    confrontos_economia(dataset)
+
+
+def consultas_completas(tipo: str, dataset) -> list:
+    consultas = []
+    if tipo in ('winrate', 'tudo'):
+        for time in sorted(indices_partidas(dataset)['partidas_por_time']):
+            consultas.append((f"winrate --time {time}", 'winrate', {'time': time}))
+    if tipo in ('economia', 'tudo'):
+        times = sorted(agregados_economia(dataset)['por_time'])
+        for a, b in itertools.combinations(times, 2):
+            consultas.append((f"economia --time-a {a} --time-b {b}", 'economia', {'time_a': a, 'time_b': b, 'mapa': None}))
+    if tipo in ('especialistas', 'tudo'):
+        for agente in sorted(indice_agentes(dataset)):
+            consultas.append((f"especialistas --agente {agente}", 'especialistas', {'agente': agente}))
+    return consultas
+
+
+_DATASET_TRABALHO = None
+
+
+def _iniciar_trabalhador(diretorio, cache_dir, bloco=None, cache_resultados=128, sqlite=None):
+    global _DATASET_TRABALHO
+    if _DATASET_TRABALHO is None:
+        _DATASET_TRABALHO = Dataset(diretorio, cache_dir=cache_dir, bloco=bloco, cache_resultados=cache_resultados,
+                                    sqlite=sqlite)
+
+
+def _executar_tarefa(tarefa):
+    relatorio, kwargs = tarefa
+    return executar_consulta(relatorio, kwargs, _DATASET_TRABALHO)
+
+
+def executar_em_paralelo(consultas, dataset=None, processos: int = None) -> list:
+    import multiprocessing
+
+    global _DATASET_TRABALHO
+    ds = dataset or DATASET
+    tarefas = [(relatorio, kwargs) for _, relatorio, kwargs in consultas]
+    if processos == 1 or len(tarefas) < 2:
+        return [executar_consulta(relatorio, kwargs, ds) for relatorio, kwargs in tarefas]
+
+    metodos = multiprocessing.get_all_start_methods()
+    if 'fork' in metodos:
+        # Com fork os filhos compartilham as tabelas já carregadas (copy-on-write).
+        aquecer(ds)
+        contexto = multiprocessing.get_context('fork')
+        _DATASET_TRABALHO = ds
+    else:
+        # Sem fork cada processo abre o próprio Dataset; com cache_dir isso é só um mmap.
+        contexto = multiprocessing.get_context()
+    try:
+        with contexto.Pool(processos, initializer=_iniciar_trabalhador, initargs=(ds.diretorio, ds.cache_dir, ds.bloco, ds.resultados.tamanho if ds.resultados else 0, ds.sqlite)) as pool:
+            chunk = max(1, len(tarefas) // ((processos or os.cpu_count() or 1) * 4))
+            # map preserva a ordem das tarefas, então o resultado é determinístico.
+            return pool.map(_executar_tarefa, tarefas, chunksize=chunk)
+    finally:
+        _DATASET_TRABALHO = None
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if args.instrumentar:
+        INSTRUMENTACAO.ativo = True
+    dataset = Dataset(args.dados, cache_dir=args.cache, bloco=args.bloco, cache_resultados=args.cache_resultados,
+                      sqlite=args.sqlite)
+    perfil = None
+    if args.perfil:
+        import cProfile
+        perfil = cProfile.Profile()
+        perfil.enable()
+    try:
+        return rodar(parser, args, dataset)
+    except BrokenPipeError:
+        # quem lia a saída fechou o pipe (ex.: "| head"): sai sem traceback e
+        # aponta o stdout para devnull para o flush final não falhar de novo
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if perfil is not None:
+            perfil.disable()
+            perfil.dump_stats(args.perfil)
+        if INSTRUMENTACAO.ativo:
+            # em execuções com --processos só o processo principal é contado
+            INSTRUMENTACAO.escrever()
+            if dataset.resultados is not None:
+                print(f"cache de resultados: {dataset.resultados.estatisticas()}", file=sys.stderr)
+            if perfil is not None:
+                import pstats
+                pstats.Stats(perfil, stream=sys.stderr).sort_stats('cumulative').print_stats(20)
+
+
+def rodar(parser, args, dataset) -> int:
+    if args.lote:
+        consultas = ler_lote(parser, args.lote)
+    elif args.relatorio == 'todos':
+        consultas = consultas_completas(args.tipo, dataset)
+    elif args.relatorio:
+        consultas = consultas_de_args(args.relatorio, args)
+    else:
+        principal(dataset, args.formato)
+        return 0
+
+    if args.processos and args.processos > 1:
+        resultados = executar_em_paralelo(consultas, dataset, args.processos)
+    else:
+        resultados = (executar_consulta(relatorio, kwargs, dataset) for _, relatorio, kwargs in consultas)
+    varias = len(consultas) > 1
+    for (consulta, relatorio, _), resultado in zip(consultas, resultados):
+        if args.json:
+            import json
+            saida = {'consulta': consulta, 'relatorio': relatorio}
+            saida.update(resultado.para_dict())
+            print(json.dumps(saida, ensure_ascii=False))
+        else:
+            if varias and args.formato == 'texto':
+                print(f"\n### {consulta}")
+            resultado.mostrar(args.formato)
+    return 0
+
+
 if __name__ == '__main__':
-    principal()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import csv
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import champions2025 as ch  # noqa: E402
+
+
+# uma consulta de cada relatório, na sintaxe da linha de comando (--lote)
+LOTE = [
+    'top10',
+    'especialistas --agente Omen',
+    'pickrate --mapa Bind',
+    'economia --time-a PRX --time-b G2',
+    "economia --time-a 'Paper Rex' --time-b fnatic --mapa Bind",
+    'matriz-economia',
+    'adaptativos',
+    'winrate --time NRG',
+    'winrate --time FNATIC',
+    'vetos',
+    'vetos --time PRX',
+    'mapas',
+    'mapas --agrupamento jogador-agente',
+    'mapas --agrupamento time-mapa --filtro NRG',
+    'multikills --quartil ambos',
+    'ranking',
+]
+
+# as mesmas consultas como (relatório, argumentos) para executar_consulta()
+CONSULTAS = [
+    ('top10', {}),
+    ('especialistas', {'agente': 'Omen'}),
+    ('pickrate', {'mapa': 'Bind'}),
+    ('economia', {'time_a': 'PRX', 'time_b': 'G2', 'mapa': None}),
+    ('economia', {'time_a': 'Paper Rex', 'time_b': 'fnatic', 'mapa': 'Bind'}),
+    ('matriz-economia', {'metrica': 'full_buy', 'mapa': None}),
+    ('adaptativos', {}),
+    ('winrate', {'time': 'NRG'}),
+    ('winrate', {'time': 'FNATIC'}),
+    ('vetos', {'time': None}),
+    ('vetos', {'time': 'PRX'}),
+    ('mapas', {'agrupamento': 'jogador-mapa', 'filtro': None, 'minimo': 1}),
+    ('mapas', {'agrupamento': 'jogador-agente', 'filtro': None, 'minimo': 1}),
+    ('mapas', {'agrupamento': 'time-mapa', 'filtro': 'NRG', 'minimo': 1}),
+    ('multikills', {'grupo': 'jogador', 'ordenar': 'multikills', 'quartil': 'ambos', 'minimo': 1, 'limite': None}),
+    ('ranking', {'derrotas': ch.DERROTAS_ELIMINACAO, 'final': ch.FASE_FINAL}),
+]
+
+
+def resultados(dataset) -> list:
+    return [ch.executar_consulta(relatorio, kwargs, dataset).para_dict() for relatorio, kwargs in CONSULTAS]
+
+
+def ler_linhas(file_name: str):
+    with open(ch.resolver_caminho(file_name), 'r', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def copiar_dados(destino: str):
+    for file_name in ch.ESQUEMAS:
+        shutil.copy(ch.resolver_caminho(file_name), destino)
+
+
+def truncar(destino: str, file_name: str, n: int):
+    # mantém o cabeçalho e as `n` primeiras linhas do CSV original
+    with open(ch.resolver_caminho(file_name), 'r', encoding='utf-8', newline='') as f:
+        linhas = list(csv.reader(f))
+    with open(os.path.join(destino, file_name), 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(linhas[:n + 1])
+
+
+def rodar(*argumentos, entrada: str = None) -> str:
+    comando = [sys.executable, os.path.join(RAIZ, 'champions2025.py'), *argumentos]
+    return subprocess.run(comando, input=entrada, capture_output=True, text=True, check=True).stdout
+
+
+class Lote:
+    # --json --lote com todas as consultas; cada modo deve bater com o padrão
+    _padrao = None
+
+    def __init__(self):
+        self.dir = tempfile.mkdtemp()
+        self.arquivo = os.path.join(self.dir, 'lote.txt')
+        with open(self.arquivo, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(LOTE) + '\n')
+
+    def rodar(self, *opcoes) -> str:
+        return rodar('--json', '--lote', self.arquivo, *opcoes)
+
+    def padrao(self) -> str:
+        if Lote._padrao is None:
+            Lote._padrao = self.rodar()
+        return Lote._padrao
+
+    def limpar(self):
+        shutil.rmtree(self.dir)
@@ -0,0 +1,37 @@
+import shutil
+import tempfile
+import unittest
+
+from comum import Lote, ch, copiar_dados, ler_linhas, resultados, truncar
+
+
+class TestBlocos(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lote = Lote()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lote.limpar()
+
+    def test_bloco_igual_ao_padrao(self):
+        self.assertEqual(self.lote.rodar('--bloco', '50'), self.lote.padrao())
+
+    def test_anexar_em_blocos_exige_persistir(self):
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        copiar_dados(diretorio)
+        file_name = 'economy_data.csv'
+        linhas = ler_linhas(file_name)
+        metade = len(linhas) // 2
+        truncar(diretorio, file_name, metade)
+        ds = ch.Dataset(diretorio, bloco=50, cache_resultados=0)
+        resultados(ds)
+        with self.assertRaises(ValueError):
+            ds.anexar(file_name, linhas[metade:])
+        ds.anexar(file_name, linhas[metade:], persistir=True)
+        self.assertEqual(resultados(ds), resultados(ch.Dataset(cache_resultados=0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
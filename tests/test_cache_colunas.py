@@ -0,0 +1,24 @@
+import os
+import unittest
+
+from comum import Lote
+
+
+class TestCacheColunas(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lote = Lote()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lote.limpar()
+
+    def test_cache_igual_ao_padrao(self):
+        cache = os.path.join(self.lote.dir, 'cache')
+        self.assertEqual(self.lote.rodar('--cache', cache), self.lote.padrao())
+        # segunda execução lê as colunas do cache
+        self.assertEqual(self.lote.rodar('--cache', cache), self.lote.padrao())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from comum import ch
+
+
+class TestCacheResultados(unittest.TestCase):
+    def test_lru_descarta_o_mais_antigo(self):
+        cache = ch.CacheResultados(2)
+        assinar = lambda arquivos: ()
+        cache.guardar('a', 1, (), ())
+        cache.guardar('b', 2, (), ())
+        self.assertEqual(cache.obter('a', assinar), 1)
+        cache.guardar('c', 3, (), ())
+        # 'a' acabou de ser usada; quem sai é 'b'
+        self.assertIsNone(cache.obter('b', assinar))
+        self.assertEqual(cache.obter('a', assinar), 1)
+        self.assertEqual(cache.obter('c', assinar), 3)
+        self.assertEqual(cache.estatisticas(), {'acertos': 3, 'faltas': 1, 'itens': 2, 'tamanho': 2})
+
+    def test_assinatura_diferente_invalida(self):
+        cache = ch.CacheResultados(2)
+        cache.guardar('a', 1, ('v1',), ('x.csv',))
+        self.assertIsNone(cache.obter('a', lambda arquivos: ('v2',)))
+        self.assertEqual(cache.estatisticas()['itens'], 0)
+
+
+class TestConsultar(unittest.TestCase):
+    def setUp(self):
+        self.ds = ch.Dataset()
+
+    def test_mesma_consulta_vem_do_cache(self):
+        primeiro = ch.consultar('winrate', self.ds, time='NRG')
+        self.assertIs(ch.consultar('winrate', self.ds, time='NRG'), primeiro)
+        # espaços não mudam a chave
+        self.assertIs(ch.consultar('pickrate', self.ds, mapa=' Bind '), ch.consultar('pickrate', self.ds, mapa='Bind'))
+        self.assertEqual(self.ds.resultados.estatisticas()['acertos'], 2)
+
+    def test_agente_sem_diferenciar_maiusculas(self):
+        omen = ch.consultar('especialistas', self.ds, agente='Omen')
+        self.assertEqual(ch.consultar('especialistas', self.ds, agente='omen').para_dict(), omen.para_dict())
+
+    def test_cabecalho_mostra_o_time_digitado(self):
+        prx = ch.consultar('economia', self.ds, time_a='PRX', time_b='G2', mapa=None)
+        nome = ch.consultar('economia', self.ds, time_a='Paper Rex', time_b='G2', mapa=None)
+        self.assertEqual(prx.para_dict()['blocos'][0]['headers'], ["Métrica", 'PRX', 'G2'])
+        self.assertEqual(nome.para_dict()['blocos'][0]['headers'], ["Métrica", 'Paper Rex', 'G2'])
+        self.assertEqual(prx.para_dict()['blocos'][0]['rows'], nome.para_dict()['blocos'][0]['rows'])
+
+    def test_menu_usa_o_cache(self):
+        respostas = iter(['2', 'Omen', '', '2', 'Omen', '', '9'])
+        with mock.patch('builtins.input', lambda *_: next(respostas)), redirect_stdout(io.StringIO()):
+            ch.principal(self.ds)
+        self.assertEqual(self.ds.resultados.estatisticas()['acertos'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from comum import ch, ler_linhas
+
+
+class TestCarregamentoPreguicoso(unittest.TestCase):
+    def setUp(self):
+        self.ds = ch.Dataset(cache_resultados=0)
+
+    def test_colunas_convertidas_no_primeiro_acesso(self):
+        tabela = self.ds.tabela('player_stats.csv', ['player'])
+        self.assertEqual(tabela.colunas, {})
+        self.assertEqual(list(tabela['player']), [l['player'] for l in ler_linhas('player_stats.csv')])
+        self.assertEqual(list(tabela.colunas), ['player'])
+
+    def test_coluna_fora_da_dica_e_lida_depois(self):
+        tabela = self.ds.tabela('player_stats.csv', ['player'])
+        self.assertIn('kills', tabela)
+        self.assertEqual(list(tabela['kills']), [int(l['kills']) for l in ler_linhas('player_stats.csv')])
+        # o resto do arquivo só é relido uma vez
+        self.assertIsNone(tabela.carregar_faltantes)
+        self.assertIs(self.ds.tabela('player_stats.csv'), tabela)
+
+    def test_coluna_inexistente(self):
+        tabela = self.ds.tabela('player_stats.csv', ['player'])
+        with self.assertRaises(KeyError):
+            tabela['nao_existe']
+        self.assertIsNone(tabela.get('nao_existe'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+
+from comum import ch
+
+
+class TestClassificacao(unittest.TestCase):
+    def classificar(self, partidas):
+        classificacao = ch.classificacao_vazia()
+        for linha, partida in enumerate(partidas):
+            ch.registrar_partida(classificacao, linha, *partida)
+        return ch.posicoes_finais(classificacao)
+
+    def test_grande_final_decide_sem_reset(self):
+        # o time da chave superior perde a final: fica em 2º, não "na disputa"
+        posicoes = self.classificar([
+            ('A', 2, 'C', 0, 'A', 'Upper Semifinals', 'Playoffs'),
+            ('A', 2, 'B', 0, 'A', 'Upper Final', 'Playoffs'),
+            ('B', 2, 'C', 1, 'B', 'Lower Final', 'Playoffs'),
+            ('A', 2, 'B', 3, 'B', 'Grand Final', 'Playoffs'),
+        ])
+        self.assertEqual([(p['pos'], p['team']) for p in posicoes],
+                         [("1º Lugar", 'B'), ("2º Lugar", 'A'), ("3º Lugar", 'C')])
+        self.assertEqual(posicoes[0]['stage'], "Vencedor da Grande Final")
+
+
+if __name__ == '__main__':
+    unittest.main()
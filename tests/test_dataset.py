@@ -0,0 +1,24 @@
+import unittest
+
+from comum import ch, ler_linhas
+
+
+class TestCarregadores(unittest.TestCase):
+    def test_carregadores_leem_do_dataset(self):
+        jogadores = ch.carregar_stats_jogadores()
+        self.assertEqual([j['player'] for j in jogadores], [l['player'] for l in ler_linhas('player_stats.csv')])
+        # colunas já convertidas pelo esquema
+        self.assertIsInstance(jogadores[0]['kills'], int)
+        self.assertIs(ch.DATASET.tabela('player_stats.csv'), ch.DATASET.tabela('player_stats.csv'))
+
+
+class TestPickrate(unittest.TestCase):
+    def test_colunas_que_nao_sao_mapas(self):
+        for coluna in ('agent_name', 'total_utilization', 'Inexistente'):
+            with self.subTest(coluna=coluna):
+                r = ch.pickrate_por_mapa(coluna, mostrar=False)
+                self.assertIn("não encontrado", r.para_dict()['blocos'][0]['texto'])
+
+
+if __name__ == '__main__':
+    unittest.main()
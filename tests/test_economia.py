@@ -0,0 +1,23 @@
+import unittest
+
+from comum import ch
+
+
+class TestMatrizEconomia(unittest.TestCase):
+    def test_resumo_da_serie_fica_de_fora(self):
+        # PRX x XLG (542195): pistols 1 em Bind + 2 em Sunset; a linha
+        # 'All Maps' repete a soma e não pode entrar de novo
+        celulas = ch.confrontos_economia(ch.Dataset(cache_resultados=0))['por_confronto']
+        self.assertEqual(celulas[('PRX', 'XLG')]['pistol_won'], 3)
+        self.assertEqual(celulas[('PRX', 'XLG')]['mapas'], 2)
+        # DRX x FNC tem resumo rotulado 'All Maps' nas duas séries
+        self.assertEqual(celulas[('DRX', 'FNC')]['pistol_won'], 6)
+
+    def test_resumo_com_nome_de_mapa(self):
+        # 542270 (FNC x NRG): o resumo veio rotulado 'for'
+        celulas = ch.confrontos_economia(ch.Dataset(cache_resultados=0))['por_confronto_mapa']
+        self.assertNotIn('for', celulas)
+
+
+if __name__ == '__main__':
+    unittest.main()
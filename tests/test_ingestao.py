@@ -0,0 +1,51 @@
+import shutil
+import tempfile
+import unittest
+
+from comum import ch, copiar_dados, ler_linhas, resultados, truncar
+
+ARQUIVOS = [
+    'matches.csv',
+    'detailed_matches_overview.csv',
+    'detailed_matches_maps.csv',
+    'economy_data.csv',
+    'player_stats.csv',
+    'detailed_matches_player_stats.csv',
+    'performance_data.csv',
+]
+
+
+class TestAnexar(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.esperado = resultados(ch.Dataset(cache_resultados=0))
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        copiar_dados(self.dir)
+
+    def test_anexar_igual_a_recarregar(self):
+        for file_name in ARQUIVOS:
+            with self.subTest(arquivo=file_name):
+                linhas = ler_linhas(file_name)
+                metade = len(linhas) // 2
+                truncar(self.dir, file_name, metade)
+                ds = ch.Dataset(self.dir, cache_resultados=0)
+                # monta as estruturas derivadas antes, para o anexar() atualizá-las
+                resultados(ds)
+                ch.ingerir(file_name, linhas[metade:], ds)
+                self.assertEqual(resultados(ds), self.esperado)
+                shutil.copy(ch.resolver_caminho(file_name), self.dir)
+
+    def test_persistir_grava_no_csv(self):
+        file_name = 'matches.csv'
+        linhas = ler_linhas(file_name)
+        truncar(self.dir, file_name, 10)
+        ds = ch.Dataset(self.dir, cache_resultados=0)
+        ch.ingerir(file_name, linhas[10:], ds, persistir=True)
+        self.assertEqual(resultados(ch.Dataset(self.dir, cache_resultados=0)), resultados(ds))
+
+
+if __name__ == '__main__':
+    unittest.main()
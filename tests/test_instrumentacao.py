@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from comum import RAIZ, ch
+
+
+class TestInstrumentacao(unittest.TestCase):
+    def test_flag_do_ambiente(self):
+        for valor, esperado in (('1', True), ('yes', True), ('0', False), ('false', False), (' OFF ', False), ('', False)):
+            with self.subTest(valor=valor), mock.patch.dict(os.environ, {'CHAMPIONS_INSTRUMENTAR': valor}):
+                self.assertIs(ch.flag_do_ambiente('CHAMPIONS_INSTRUMENTAR'), esperado)
+
+    def test_registra_relatorios_e_leituras(self):
+        with mock.patch.object(ch.INSTRUMENTACAO, 'ativo', True), mock.patch.object(ch.INSTRUMENTACAO, 'etapas', {}):
+            ch.listar_top10_performance(dataset=ch.Dataset(cache_resultados=0), mostrar=False)
+            etapas = dict((e[0], e[1:]) for e in ch.INSTRUMENTACAO.resumo())
+        self.assertEqual(etapas['relatorio:listar_top10_performance'][0], 1)
+        self.assertGreater(etapas['csv:player_stats.csv'][2], 0)
+
+    def test_desligada_nao_registra(self):
+        with mock.patch.object(ch.INSTRUMENTACAO, 'ativo', False), mock.patch.object(ch.INSTRUMENTACAO, 'etapas', {}):
+            ch.listar_top10_performance(dataset=ch.Dataset(cache_resultados=0), mostrar=False)
+            self.assertEqual(ch.INSTRUMENTACAO.etapas, {})
+
+    def test_variavel_zero_desliga_na_linha_de_comando(self):
+        comando = [sys.executable, os.path.join(RAIZ, 'champions2025.py'), 'top10']
+        for valor, relatorio in (('0', False), ('1', True)):
+            with self.subTest(valor=valor):
+                env = dict(os.environ, CHAMPIONS_INSTRUMENTAR=valor)
+                erro = subprocess.run(comando, capture_output=True, text=True, check=True, env=env).stderr
+                self.assertEqual('relatorio:listar_top10_performance' in erro, relatorio)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import shutil
+import sys
+import tempfile
+import unittest
+
+from comum import RAIZ, rodar
+
+
+class TestLinhaDeComando(unittest.TestCase):
+    def test_json_depois_do_subcomando(self):
+        self.assertEqual(rodar('top10', '--json'), rodar('--json', 'top10'))
+        self.assertEqual(json.loads(rodar('top10', '--json'))['relatorio'], 'top10')
+
+    def test_pipe_fechado_sai_sem_traceback(self):
+        # saída bem maior que o buffer do pipe, para o processo ainda estar escrevendo
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        lote = os.path.join(diretorio, 'lote.txt')
+        with open(lote, 'w', encoding='utf-8') as f:
+            f.write('mapas --agrupamento jogador-agente\n' * 50)
+        comando = [sys.executable, os.path.join(RAIZ, 'champions2025.py'), '--json', '--lote', lote]
+        processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        processo.stdout.readline()
+        processo.stdout.close()
+        erro = processo.stderr.read()
+        processo.stderr.close()
+        self.assertEqual(processo.wait(), 1)
+        self.assertNotIn('Traceback', erro)
+
+
+if __name__ == '__main__':
+    unittest.main()
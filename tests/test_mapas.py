@@ -0,0 +1,40 @@
+import random
+import statistics
+import unittest
+from collections import Counter
+
+from comum import ch, ler_linhas
+
+
+class TestPercentis(unittest.TestCase):
+    def test_contagem_igual_a_statistics(self):
+        gerador = random.Random(17)
+        for tamanho in (2, 3, 4, 7, 50, 301):
+            valores = [round(gerador.uniform(0.3, 2.0), 1) for _ in range(tamanho)]
+            with self.subTest(tamanho=tamanho):
+                esperado = statistics.quantiles(valores, n=4)
+                for obtido, valor in zip(ch.quantis_contagem(Counter(valores), n=4), esperado):
+                    self.assertAlmostEqual(obtido, valor)
+                for obtido, valor in zip(ch.quantis(valores, n=4), esperado):
+                    self.assertAlmostEqual(obtido, valor)
+
+    def test_poucos_valores(self):
+        with self.assertRaises(statistics.StatisticsError):
+            ch.quantis_contagem(Counter([1.0]))
+
+    def test_relatorio_usa_os_ratings_do_mapa(self):
+        linhas = [l for l in ler_linhas('detailed_matches_player_stats.csv')
+                  if l['stat_type'] == 'map' and l['player_name'].strip() == 'aspas' and l['map_name'].strip()]
+        por_mapa = {}
+        for l in linhas:
+            por_mapa.setdefault(l['map_name'].strip(), []).append(float(l['rating']))
+        mapa, ratings = max(por_mapa.items(), key=lambda item: len(item[1]))
+        r = ch.desempenho_por_mapa('jogador-mapa', 'aspas', dataset=ch.Dataset(cache_resultados=0), mostrar=False)
+        tabela = r.para_dict()['blocos'][0]
+        linha = next(row for row in tabela['rows'] if row[1] == mapa)
+        self.assertEqual(linha[2], len(ratings))
+        self.assertEqual(linha[5:8], [f"{p:.2f}" for p in statistics.quantiles(ratings, n=4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
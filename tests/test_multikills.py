@@ -0,0 +1,41 @@
+import statistics
+import unittest
+
+from comum import ch
+
+
+class TestMascaras(unittest.TestCase):
+    def test_mascaras(self):
+        self.assertEqual(ch.mascara_minimo([1, 5, 3], 3), [False, True, True])
+        self.assertEqual(ch.combinar_mascaras([True, True, False], [False, True, True]), [False, True, False])
+
+    def test_limite_quartil_so_entre_elegiveis(self):
+        valores = [1, 2, 3, 4, 5, 6, 7, 100]
+        elegiveis = [True] * 7 + [False]
+        self.assertEqual(ch.limite_quartil(valores, elegiveis), statistics.quantiles(valores[:7], n=4)[2])
+        # poucos valores: usa a mediana
+        self.assertEqual(ch.limite_quartil([2, 9], [True, False]), 2)
+
+
+class TestMultikills(unittest.TestCase):
+    def test_ambos_cruza_quartis_calculados_sobre_os_elegiveis(self):
+        ds = ch.Dataset(cache_resultados=0)
+        grupos = ch.agregados_performance(ds)['por_jogador']
+        elegiveis = {k: t for k, t in grupos.items() if t['n'] >= 3}
+        corte = {}
+        for nome in ('multikills', 'clutches'):
+            valores = [ch.CRITERIOS_PERFORMANCE[nome](t) for t in elegiveis.values()]
+            corte[nome] = statistics.quantiles(valores, n=4)[2]
+        esperado = {k for k, t in elegiveis.items()
+                    if all(ch.CRITERIOS_PERFORMANCE[nome](t) >= corte[nome] for nome in corte)}
+        self.assertTrue(esperado)
+
+        r = ch.analisar_multikills(quartil='ambos', minimo=3, dataset=ds, mostrar=False).para_dict()
+        tabela = r['blocos'][1]
+        self.assertEqual(r['blocos'][0]['texto'], "Acima do 3º quartil em: multikills e clutches")
+        self.assertEqual({row[0] for row in tabela['rows']}, esperado)
+        self.assertTrue(all(row[1] >= 3 for row in tabela['rows']))
+
+
+if __name__ == '__main__':
+    unittest.main()
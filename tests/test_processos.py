@@ -0,0 +1,20 @@
+import unittest
+
+from comum import Lote
+
+
+class TestProcessos(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lote = Lote()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lote.limpar()
+
+    def test_processos_igual_ao_padrao(self):
+        self.assertEqual(self.lote.rodar('--processos', '2'), self.lote.padrao())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from comum import ch
+
+
+class TestRegistro(unittest.TestCase):
+    def setUp(self):
+        self.tabela = ch.Dataset(cache_resultados=0).tabela('player_stats.csv')
+
+    def test_linha_le_das_colunas(self):
+        registro = self.tabela.linha(0)
+        self.assertEqual(registro['player'], self.tabela['player'][0])
+        self.assertEqual(list(registro), self.tabela.nomes)
+        self.assertEqual(dict(registro), {nome: self.tabela[nome][0] for nome in self.tabela.nomes})
+        self.assertEqual(registro.get('inexistente', 'x'), 'x')
+
+    def test_registro_nao_tem_dict(self):
+        registro = self.tabela.linha(0)
+        with self.assertRaises(AttributeError):
+            registro.extra = 1
+        with self.assertRaises(TypeError):
+            registro['player'] = 'outro'
+
+    def test_linhas_e_registros(self):
+        linhas = self.tabela.linhas()
+        self.assertEqual(len(linhas), len(self.tabela))
+        ds = ch.Dataset(bloco=20, cache_resultados=0)
+        self.assertEqual([dict(r) for r in ds.registros('player_stats.csv')], [dict(r) for r in linhas])
+
+
+if __name__ == '__main__':
+    unittest.main()
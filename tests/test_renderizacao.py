@@ -0,0 +1,61 @@
+import io
+import json
+import unittest
+
+from comum import ch, rodar
+
+HEADERS = ["Time", "Pontos"]
+ROWS = [["PRX", 10], ["Team Liquid", 7], ["G2", 3]]
+
+
+def renderizar(rows, formato='texto', **kwargs) -> str:
+    saida = io.StringIO()
+    ch.renderizar_tabela(HEADERS, rows, formato, saida, **kwargs)
+    return saida.getvalue()
+
+
+class TestRenderizacao(unittest.TestCase):
+    def test_texto_mede_todas_as_linhas(self):
+        self.assertEqual(renderizar(ROWS).splitlines(), [
+            "+-------------+--------+",
+            "|Time        |Pontos |",
+            "+-------------+--------+",
+            "|PRX         |10     |",
+            "|Team Liquid |7      |",
+            "|G2          |3      |",
+            "+-------------+--------+",
+        ])
+
+    def test_amostra_mede_so_as_primeiras(self):
+        linhas = renderizar(iter(ROWS), amostra=1).splitlines()
+        self.assertEqual(linhas[0], "+------+--------+")
+        self.assertEqual(linhas[4], "|Team Liquid|7      |")
+
+    def test_larguras_fixas_consomem_o_iterador(self):
+        consumidas = []
+
+        def gerar():
+            for row in ROWS:
+                consumidas.append(row)
+                yield row
+        linhas = renderizar(gerar(), larguras=[4, 6]).splitlines()
+        self.assertEqual(linhas[0], "+------+--------+")
+        self.assertEqual(consumidas, ROWS)
+        self.assertEqual(len(linhas), 7)
+
+    def test_formatos(self):
+        self.assertEqual(renderizar(ROWS, 'csv'), "Time,Pontos\nPRX,10\nTeam Liquid,7\nG2,3\n")
+        self.assertEqual([json.loads(l) for l in renderizar(iter(ROWS), 'jsonl').splitlines()],
+                         [{"Time": "PRX", "Pontos": 10}, {"Time": "Team Liquid", "Pontos": 7}, {"Time": "G2", "Pontos": 3}])
+        self.assertEqual(renderizar([["a|b", 1]], 'markdown'), "| Time | Pontos |\n|---|---|\n| a\\|b | 1 |\n")
+        with self.assertRaises(ValueError):
+            renderizar(ROWS, 'html')
+
+    def test_formato_depois_do_subcomando(self):
+        saida = rodar('matriz-economia', '--formato', 'csv', '--metrica', 'pistol')
+        self.assertEqual(saida, rodar('--formato', 'csv', 'matriz-economia', '--metrica', 'pistol'))
+        self.assertTrue(saida.splitlines()[1].startswith("Time \\ Adversário,"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import os
+import unittest
+
+from comum import Lote
+
+
+class TestSQLite(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lote = Lote()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lote.limpar()
+
+    def test_sqlite_igual_ao_padrao(self):
+        banco = os.path.join(self.lote.dir, 'sqlite.db')
+        self.assertEqual(self.lote.rodar('--sqlite', banco), self.lote.padrao())
+        # segunda execução reaproveita o banco já importado
+        self.assertEqual(self.lote.rodar('--sqlite', banco), self.lote.padrao())
+
+    def test_sqlite_processos_banco_novo(self):
+        banco = os.path.join(self.lote.dir, 'novo.db')
+        self.assertEqual(self.lote.rodar('--sqlite', banco, '--processos', '4'), self.lote.padrao())
+
+
+if __name__ == '__main__':
+    unittest.main()
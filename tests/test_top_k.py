@@ -0,0 +1,29 @@
+import random
+import unittest
+
+from comum import ch
+
+
+class TestTopK(unittest.TestCase):
+    def test_empates_na_ordem_de_entrada(self):
+        itens = [('a', 3), ('b', 5), ('c', 3), ('d', 5), ('e', 1), ('f', 3)]
+        chave = lambda item: item[1]
+        for k in range(len(itens) + 2):
+            with self.subTest(k=k):
+                self.assertEqual(ch.maiores(k, itens, chave), sorted(itens, key=chave, reverse=True)[:k])
+
+    def test_aleatorio_igual_a_sorted(self):
+        gerador = random.Random(2025)
+        valores = [gerador.randint(0, 20) for _ in range(500)]
+        self.assertEqual(ch.maiores(10, range(len(valores)), valores.__getitem__),
+                         sorted(range(len(valores)), key=valores.__getitem__, reverse=True)[:10])
+
+    def test_top_k_desempata_pelas_colunas_seguintes(self):
+        rating = [1.0, 1.2, 1.2, 0.9]
+        acs = [200, 180, 210, 250]
+        self.assertEqual(ch.top_k(3, rating, acs), [2, 1, 0])
+        self.assertEqual(ch.top_k(2, rating, acs, mascara=[True, True, False, True]), [1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,16 @@
+import unittest
+
+from comum import ch
+
+
+class TestVetos(unittest.TestCase):
+    def test_time_com_nome_composto(self):
+        ignorados = []
+        eventos = ch.parsear_vetos("Team Liquid ban Lotus; PRX pick Sunset; ???; Ascent remains", ignorados)
+        self.assertEqual([(e['time'], e['acao'], e['mapa']) for e in eventos],
+                         [('TL', 'ban', 'Lotus'), ('PRX', 'pick', 'Sunset'), (None, 'remains', 'Ascent')])
+        self.assertEqual(ignorados, ['???'])
+
+
+if __name__ == '__main__':
+    unittest.main()